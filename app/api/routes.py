@@ -1,53 +1,281 @@
 # JamieBot/app/api/routes.py
-from fastapi import APIRouter, HTTPException
-from app.schemas import AIRequest, AIResponse
-from app.orchestrator import Orchestrator
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from app.schemas import AIBatchItem, AIBatchRequest, AIBatchResponse, AIRequest, AIResponse
+from app.config import Config
+from app.followup_worker import FollowUpWorker
+from app.orchestrator import AsyncOrchestrator
+from app.replay import ReplayRunner, load_conversations
 from app.state_machine.states import ConversationState
-from app.services.redis_service import RedisService
+from app.state_machine.transition_table import get_transition_table
+from app.services import metrics
+from app.services.followups import FollowUpScheduler
+from app.services.history_summary import HistorySummarizer, fitted_count
+from app.services.redis_service import AsyncRedisService
+from app.services.session_store import Session, SessionConflictError, SessionStore
+from app.services.turn_lock import TurnLock, TurnLockTimeout
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
-orchestrator = Orchestrator()
-redis_service = RedisService()
+orchestrator = AsyncOrchestrator()
+redis_service = AsyncRedisService()
+followups = FollowUpScheduler(redis_service) if Config.FOLLOWUP_ENABLED else None
+session_store = SessionStore(redis_service, followups=followups)
+turn_lock = TurnLock(redis_service)
+# Started by app.main when FOLLOWUP_IN_PROCESS is set; otherwise run python -m app.followup_worker
+followup_worker = FollowUpWorker(orchestrator, redis_service, followups, session_store, turn_lock) if followups else None
+# Rolling history summaries, refreshed in the background after a turn commits
+summarizer = HistorySummarizer(redis_service, orchestrator.llm_service) if Config.SUMMARY_ENABLED else None
+# Compiled + validated at import, so a broken table fails the deploy instead of a turn
+transition_table = get_transition_table()
+
+# Stats the services already count, exported as-is at scrape time
+for name, documentation, label, read in [
+    ("jamie_extractions_total", "Attribute extractions by source", "source", lambda: orchestrator.llm_service.extraction_stats),
+    ("jamie_generations_total", "Generation strategies and validation outcomes", "outcome", lambda: orchestrator.llm_service.generation_stats),
+    ("jamie_speculations_total", "Speculative drafts used (hits) or discarded (misses)", "result", lambda: orchestrator.speculation_stats),
+    ("jamie_degraded_replies_total", "Scripted replies served instead of the LLM", "reason", lambda: orchestrator.degradation_stats),
+    ("jamie_llm_cache_events_total", "Extraction cache hits, misses and evictions", "event", lambda: orchestrator.llm_service.extraction_cache.stats),
+    ("jamie_prompt_fallbacks_total", "Missing prompt files served with the fallback prompt", "prompt", lambda: orchestrator.prompts.stats()["fallbacks_by_prompt"]),
+    ("jamie_summary_refreshes_total", "Background history summary refreshes by outcome", "outcome", lambda: summarizer.stats if summarizer else {}),
+    ("jamie_followups_total", "Follow-ups handled by this process's worker", "outcome", lambda: followup_worker.stats if followup_worker else {}),
+]:
+    metrics.REGISTRY.register(metrics.CallbackMetric(name, documentation, label, read))
+
+def _validate_state(request: AIRequest) -> None:
+    if request.current_state is not None and request.current_state not in ConversationState.__members__:
+        raise HTTPException(status_code=400, detail=f"Invalid state: {request.current_state}")
+
+# Shared by every /process-messages call in this process, so big batches queue instead of piling up
+batch_semaphore = asyncio.Semaphore(max(1, Config.BATCH_CONCURRENCY))
+
+def _status_for(e: Exception) -> int:
+    """
+    HTTP status a failed turn maps to (same for single and batch turns).
+    """
+    if isinstance(e, HTTPException):
+        return e.status_code
+    if isinstance(e, TurnLockTimeout):
+        return 429
+    if isinstance(e, SessionConflictError):
+        return 409
+    if isinstance(e, ValueError):
+        return 400
+    return 500
+
+async def _load_turn(request: AIRequest, loaded: Optional[Tuple[Session, List[Dict]]] = None) -> Tuple[Session, List[Dict]]:
+    """
+    Loads the server-side session + recent history in one round-trip (unless the
+    batch route already `loaded` them). Legacy clients that still send
+    current_state/user_attributes override the stored values.
+    """
+    if loaded is None:
+        with metrics.span("session_load"):
+            loaded = await session_store.load(request.user_id)
+    session, history = loaded
+
+    if request.current_state is not None:
+        session.state = ConversationState[request.current_state]
+
+    if request.user_attributes is not None:
+        attributes = dict(request.user_attributes)
+        session.turn_count = attributes.pop("current_state_turn_count", 0)
+        session.attributes = attributes
+
+    return session, history
+
+async def _save_turn(request: AIRequest, session: Session, history: List[Dict], result: Dict, fence: int) -> AIResponse:
+    # Session + both messages in one optimistic transaction
+    session.apply_result(result)
+    with metrics.span("session_commit"):
+        await session_store.commit(request.user_id, session, request.message, result["reply"], fence=fence)
+    if summarizer is not None:
+        # Messages the next prompt can't fit must end up in the summary
+        turn = [{"role": "user", "content": request.message}, {"role": "assistant", "content": result["reply"]}]
+        summarizer.schedule(request.user_id, keep_recent=fitted_count(history + turn))
+
+    return AIResponse(
+        reply=result["reply"],
+        next_state=result["next_state"],
+        extracted_attributes=result.get("extracted_attributes"),
+    )
 
 @router.post("/process-message", response_model=AIResponse)
-def process_message(request: AIRequest):
+async def process_message(request: AIRequest):
+    started = time.perf_counter()
     try:
-        # 1. Retrieve History from Redis
-        history = redis_service.get_history(request.user_id)
-        
-        # 2. Validate State
-        if request.current_state not in ConversationState.__members__:
-            raise HTTPException(status_code=400, detail=f"Invalid state: {request.current_state}")
-        
-        current_state = ConversationState[request.current_state]
-        
-        # 3. Process Message (Pass History)
-        result = orchestrator.process_message(
-            user_message=request.message,
-            current_state=current_state,
-            extracted_attributes=request.user_attributes,
-            history=history # <--- Context Injection
-        )
-        
-        # 4. Save Interaction to Redis (Memory)
-        # Save User Message
-        redis_service.add_message(request.user_id, "user", request.message)
-        # Save Bot Reply
-        redis_service.add_message(request.user_id, "assistant", result["reply"])
-        
-        return AIResponse(
-            reply=result["reply"],
-            next_state=result["next_state"],
-            extracted_attributes=result.get("extracted_attributes"),
-        )
-        
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        _validate_state(request)
+
+        # One turn per user at a time: a double-send waits for the first reply
+        async with turn_lock.hold(request.user_id) as fence:
+            metrics.TURN_STEP_SECONDS.observe(time.perf_counter() - started, step="lock_wait")
+
+            # 1. Retrieve Session + History from Redis
+            session, history = await _load_turn(request)
+
+            # 2. Process Message (Pass History)
+            result = await orchestrator.process_message(
+                user_message=request.message,
+                current_state=session.state,
+                extracted_attributes=session.orchestrator_attributes(),
+                history=history # <--- Context Injection
+            )
+
+            # 3. Save Session + Interaction to Redis (Memory)
+            return await _save_turn(request, session, history, result, fence)
+
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=_status_for(e), detail=str(e))
+    finally:
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint="process_message")
+
+@router.post("/process-messages", response_model=AIBatchResponse)
+async def process_messages(batch: AIBatchRequest):
+    """
+    Several users' turns in one call. Sessions + histories for every user are
+    fetched in one pipeline, then turns run concurrently (capped by
+    BATCH_CONCURRENCY); a user's turns run in list order. Each item reports its
+    own status, so one bad turn never fails the batch.
+    """
+    started = time.perf_counter()
+    if len(batch.items) > Config.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {Config.BATCH_MAX_ITEMS} items per batch")
+
+    try:
+        with metrics.span("session_load"):
+            preloaded = await session_store.load_many([item.user_id for item in batch.items])
+
+        by_user: Dict[str, List[int]] = {}
+        for index, item in enumerate(batch.items):
+            by_user.setdefault(item.user_id, []).append(index)
+        results: List[Optional[AIBatchItem]] = [None] * len(batch.items)
+
+        async def run_turn(index: int, loaded: Optional[Tuple[Session, List[Dict]]]) -> None:
+            request = batch.items[index]
+            try:
+                _validate_state(request)
+                async with batch_semaphore:
+                    async with turn_lock.hold(request.user_id) as fence:
+                        # A turn that committed between the preload and the lock (another
+                        # request for this user) makes the preload stale: load it again
+                        if loaded is not None and await session_store.version(request.user_id) != loaded[0].version:
+                            loaded = None
+                        session, history = await _load_turn(request, loaded)
+                        result = await orchestrator.process_message(
+                            user_message=request.message,
+                            current_state=session.state,
+                            extracted_attributes=session.orchestrator_attributes(),
+                            history=history
+                        )
+                        response = await _save_turn(request, session, history, result, fence)
+                results[index] = AIBatchItem(index=index, user_id=request.user_id, status=200, response=response)
+            except Exception as e:
+                status = _status_for(e)
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                if status == 500:
+                    logger.error(f"Batch item {index} ({request.user_id}) failed: {e}")
+                results[index] = AIBatchItem(index=index, user_id=request.user_id, status=status, error=detail)
+
+        async def run_user(indexes: List[int]) -> None:
+            # Only the first turn can use the preload; later ones must see its commit
+            await run_turn(indexes[0], preloaded[batch.items[indexes[0]].user_id])
+            for index in indexes[1:]:
+                await run_turn(index, None)
+
+        await asyncio.gather(*(run_user(indexes) for indexes in by_user.values()))
+        return AIBatchResponse(results=results)
+    except Exception as e:
+        # Only the shared preload can fail the whole batch
+        raise HTTPException(status_code=503, detail=str(e))
+    finally:
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint="process_messages")
 
 @router.delete("/clear-history/{user_id}")
-def clear_history(user_id: str):
+async def clear_history(user_id: str):
     """Utility to reset a user's memory"""
-    redis_service.clear_history(user_id)
-    return {"status": "cleared"}
\ No newline at end of file
+    await redis_service.clear_history(user_id)
+    await session_store.clear(user_id)
+    return {"status": "cleared"}
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint (text exposition format 0.0.4); per process, see Config.METRICS_PORT"""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+@router.get("/state-machine")
+async def state_machine():
+    """Funnel transition graph (edges + validation warnings), for docs and dashboards"""
+    return {**transition_table.graph(), "dot": transition_table.to_dot()}
+
+def _sse(data: dict, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+@router.post("/process-message/stream")
+async def process_message_stream(request: AIRequest):
+    """
+    Same turn as /process-message, delivered as Server-Sent Events:
+    `data: {"delta": ...}` chunks while the reply is generated, then one
+    `event: done` with the full AIResponse payload (or `event: error`).
+    """
+    _validate_state(request)
+
+    async def event_stream():
+        started = time.perf_counter()
+        try:
+            async with turn_lock.hold(request.user_id) as fence:
+                metrics.TURN_STEP_SECONDS.observe(time.perf_counter() - started, step="lock_wait")
+                session, history = await _load_turn(request)
+
+                async for kind, payload in orchestrator.stream_message(
+                    user_message=request.message,
+                    current_state=session.state,
+                    extracted_attributes=session.orchestrator_attributes(),
+                    history=history
+                ):
+                    if kind == "delta":
+                        yield _sse({"delta": payload})
+                        continue
+
+                    response = await _save_turn(request, session, history, payload, fence)
+                    yield _sse(response.model_dump(), event="done")
+        except Exception as e:
+            logger.error(f"Streaming Error: {e}")
+            yield _sse({"detail": str(e)}, event="error")
+        finally:
+            metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint="process_message_stream")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/replay")
+async def replay(request: Request, concurrency: int = Query(Config.REPLAY_CONCURRENCY, ge=1, le=Config.REPLAY_CONCURRENCY)):
+    """
+    Offline evaluation / load generation: the body is replay JSONL (see app/replay.py).
+    Conversations run through the orchestrator with in-memory state (no sessions are
+    written) and per-turn results stream back as JSONL. `concurrency` may lower
+    the REPLAY_CONCURRENCY cap, not raise it.
+    """
+    try:
+        conversations = load_conversations((await request.body()).decode("utf-8").splitlines())
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    runner = ReplayRunner(orchestrator, concurrency=concurrency)
+
+    async def results():
+        async for record in runner.run(conversations):
+            yield json.dumps(record) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
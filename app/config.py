@@ -6,11 +6,142 @@ load_dotenv()
 
 class Config:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    # LLM backend: "openai" or "fake" (local stand-in for benchmarks / offline runs)
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "openai").lower()
+    # Fake backend: latency model (fixed | uniform | lognormal), replies (canned | echo)
+    FAKE_LLM_MODE = os.getenv("FAKE_LLM_MODE", "canned").lower()
+    FAKE_LLM_LATENCY = os.getenv("FAKE_LLM_LATENCY", "lognormal").lower()
+    FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", 400))
+    FAKE_LLM_JITTER_MS = float(os.getenv("FAKE_LLM_JITTER_MS", 150))
+    FAKE_LLM_TOKENS_PER_SEC = float(os.getenv("FAKE_LLM_TOKENS_PER_SEC", 80))
+    FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", 7))
+    # Optional JSON file {"STATE": "reply"} overriding the canned replies
+    FAKE_LLM_RESPONSES = os.getenv("FAKE_LLM_RESPONSES")
+    FAKE_LLM_EXTRACTION = os.getenv("FAKE_LLM_EXTRACTION", "UNKNOWN")
+    # OpenAI Transport (shared httpx pool per process)
+    OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "true").lower() == "true"
+    OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", 200))
+    OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", 50))
+    OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", 30.0))
+    OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", 3.0))
+    OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", 20.0))
+    # Retries (jittered exponential backoff) + circuit breaker
+    OPENAI_MAX_ATTEMPTS = int(os.getenv("OPENAI_MAX_ATTEMPTS", 3))
+    OPENAI_BACKOFF_BASE = float(os.getenv("OPENAI_BACKOFF_BASE", 0.25))
+    OPENAI_BACKOFF_MAX = float(os.getenv("OPENAI_BACKOFF_MAX", 4.0))
+    OPENAI_BREAKER_FAILURES = int(os.getenv("OPENAI_BREAKER_FAILURES", 5))
+    OPENAI_BREAKER_RESET = float(os.getenv("OPENAI_BREAKER_RESET", 30.0))
+
     # Redis Config
     REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
     REDIS_DB = int(os.getenv("REDIS_DB", 0))
     REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", None)
+    # Upper bound on pooled connections for the asyncio client (per process)
+    REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 100))
     
     # Session Expiry (24 hours in seconds)
-    SESSION_TTL = 86400
\ No newline at end of file
+    SESSION_TTL = 86400
+
+    # Chat History
+    # Messages fed to the LLM per turn, only this many are read from Redis (0 = all)
+    HISTORY_WINDOW = int(os.getenv("HISTORY_WINDOW", 10))
+    # Hard cap on stored messages per user (older ones are trimmed)
+    HISTORY_MAX_MESSAGES = int(os.getenv("HISTORY_MAX_MESSAGES", 50))
+    # Stored entry format: "binary" (role byte + UTF-8, zlib for long messages) or "json" (legacy).
+    # This release reads both but still writes JSON by default: workers from the previous
+    # release can only read JSON and would crash on binary entries during a rolling deploy.
+    # Two-phase rollout: deploy this release everywhere, then set HISTORY_CODEC=binary
+    # (the default flips to "binary" in the next release).
+    HISTORY_CODEC = os.getenv("HISTORY_CODEC", "json")
+    # Messages at least this many bytes are zlib-compressed when that makes them smaller (0 = never)
+    HISTORY_COMPRESS_MIN = int(os.getenv("HISTORY_COMPRESS_MIN", 200))
+    HISTORY_COMPRESS_LEVEL = int(os.getenv("HISTORY_COMPRESS_LEVEL", 6))
+    # Token ceiling for history per LLM call (rolling summary + most recent messages)
+    HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", 1200))
+    # Rolling summary (jamie_summary:{user_id}) of messages older than HISTORY_WINDOW,
+    # refreshed in the background once SUMMARY_MIN_BATCH of them are pending
+    SUMMARY_ENABLED = os.getenv("SUMMARY_ENABLED", "true").lower() == "true"
+    SUMMARY_MIN_BATCH = int(os.getenv("SUMMARY_MIN_BATCH", 6))
+    SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", 200))
+
+    # Funnel transitions (defaults to app/state_machine/transition_table.json)
+    TRANSITION_TABLE_PATH = os.getenv("TRANSITION_TABLE_PATH")
+
+    # Batch replay (python -m app.replay / POST /replay): conversations in flight at once
+    REPLAY_CONCURRENCY = int(os.getenv("REPLAY_CONCURRENCY", 16))
+
+    # Prompt Registry (reload app/prompts/*.txt when files change)
+    PROMPT_HOT_RELOAD = os.getenv("PROMPT_HOT_RELOAD", "false").lower() == "true"
+    PROMPT_RELOAD_INTERVAL = float(os.getenv("PROMPT_RELOAD_INTERVAL", 2.0))
+
+    # Per-user turn lock (serializes double-sends across workers)
+    TURN_LOCK_LEASE_MS = int(os.getenv("TURN_LOCK_LEASE_MS", 60000))
+    TURN_LOCK_WAIT_TIMEOUT = float(os.getenv("TURN_LOCK_WAIT_TIMEOUT", 30.0))
+
+    # LLM response cache (deterministic extraction calls only)
+    LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", 10000))
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", 86400))
+    # Also share cached answers across workers through Redis
+    LLM_CACHE_REDIS = os.getenv("LLM_CACHE_REDIS", "false").lower() == "true"
+
+    # Generation strategy
+    # States answered by one voice-model call (no brain draft + rewrite); comma-separated state names
+    SINGLE_PASS_STATES = {
+        state.strip() for state in os.getenv(
+            "SINGLE_PASS_STATES",
+            "ENTRY,ENTRY_SOCIAL,STAGE_2_TIME_COST,STAGE_3_ADDITIONAL,STAGE_4_FAILED_SOLUTIONS,"
+            "STAGE_5_GOAL,STAGE_6_GAP,STAGE_10_QUAL_LOCATION,STAGE_10_QUAL_AGE,"
+            "STAGE_10_QUAL_RELATIONSHIP,STAGE_10_QUAL_FITNESS,STAGE_10_QUAL_FINANCE",
+        ).split(",") if state.strip()
+    }
+
+    # Reply validation (max 2 sentences, max 1 question)
+    # Extra LLM calls allowed per turn when local repair can't fix a reply
+    REPLY_MAX_REGENERATIONS = int(os.getenv("REPLY_MAX_REGENERATIONS", 1))
+    # Per-turn ceilings for generation + regeneration (tokens counted as max_output_tokens per call)
+    REPLY_TOKEN_BUDGET = int(os.getenv("REPLY_TOKEN_BUDGET", 600))
+    REPLY_LATENCY_BUDGET = float(os.getenv("REPLY_LATENCY_BUDGET", 8.0))
+
+    # Degraded mode: scripted per-state reply when the LLM misses the state's SLO
+    # (SLOs + replies live in app/prompts/fallbacks.json)
+    DEGRADED_MODE = os.getenv("DEGRADED_MODE", "true").lower() == "true"
+    # SLO in seconds for states fallbacks.json doesn't cover
+    RESPONSE_SLO_DEFAULT = float(os.getenv("RESPONSE_SLO_DEFAULT", 6.0))
+
+    # Follow-ups for users who went quiet (followup_10_min.txt / followup_24_hour.txt)
+    # Turns are scheduled in Redis sorted sets; the worker (python -m app.followup_worker) sends them
+    # Also run the worker inside the API process (one per worker process; claims are atomic)
+    FOLLOWUP_IN_PROCESS = os.getenv("FOLLOWUP_IN_PROCESS", "false").lower() == "true"
+    # Scheduling defaults to on only when this process also sends them; deployments running
+    # the separate worker set FOLLOWUP_ENABLED=true, otherwise the sets just pile up
+    FOLLOWUP_ENABLED = os.getenv("FOLLOWUP_ENABLED", str(FOLLOWUP_IN_PROCESS)).lower() == "true"
+    # Seconds of silence before each stage. The last one must land before SESSION_TTL drops the history.
+    FOLLOWUP_DELAYS = {
+        "10_min": int(os.getenv("FOLLOWUP_10_MIN_DELAY", 600)),
+        "24_hour": int(os.getenv("FOLLOWUP_24_HOUR_DELAY", 82800)),
+    }
+    FOLLOWUP_BATCH_SIZE = int(os.getenv("FOLLOWUP_BATCH_SIZE", 200))
+    FOLLOWUP_CONCURRENCY = int(os.getenv("FOLLOWUP_CONCURRENCY", 32))
+    FOLLOWUP_POLL_INTERVAL = float(os.getenv("FOLLOWUP_POLL_INTERVAL", 5.0))
+    # A claimed follow-up not acknowledged within the lease is retried (worker crash / LLM error)
+    FOLLOWUP_LEASE = int(os.getenv("FOLLOWUP_LEASE", 120))
+    FOLLOWUP_MAX_ATTEMPTS = int(os.getenv("FOLLOWUP_MAX_ATTEMPTS", 3))
+    # Generated follow-ups are appended to the jamie_outbox stream for the delivery backend
+    FOLLOWUP_OUTBOX_MAXLEN = int(os.getenv("FOLLOWUP_OUTBOX_MAXLEN", 100000))
+
+    # Batch turns (POST /process-messages)
+    BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 100))
+    # Turns in flight at once across all batch requests in this process
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 32))
+
+    # Production server (python -m app.server): warm once, then prefork this many workers
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    HOST = os.getenv("HOST", "0.0.0.0")
+    PORT = int(os.getenv("PORT", 8000))
+    # Seconds a worker gets to finish in-flight requests on shutdown
+    GRACEFUL_TIMEOUT = float(os.getenv("GRACEFUL_TIMEOUT", 30.0))
+    # Metrics live in each worker's memory and GET /metrics on PORT reaches a random one,
+    # so every prefork worker also serves them on METRICS_PORT + its number. Scrape all
+    # WEB_CONCURRENCY of those ports (and sum in queries); 0 disables the per-worker ports.
+    METRICS_PORT = int(os.getenv("METRICS_PORT", 9100))
@@ -0,0 +1,147 @@
+# JamieBot/app/followup_worker.py
+"""
+Sends follow-ups to users who went quiet.
+
+    python -m app.followup_worker
+
+Run it with FOLLOWUP_ENABLED=true on the API processes, so they schedule.
+Any number of workers can run side by side (or in-process, FOLLOWUP_IN_PROCESS):
+each due user is claimed by exactly one of them, and a follow-up is only written
+if the user hasn't replied since it was scheduled.
+"""
+import asyncio
+import logging
+import sys
+from collections import Counter
+from typing import Optional
+from app.config import Config
+from app.orchestrator import AsyncOrchestrator
+from app.services.followups import FollowUpJob, FollowUpScheduler
+from app.services.redis_service import AsyncRedisService
+from app.services.session_store import SessionStore
+from app.services.turn_lock import TurnLock, TurnLockTimeout
+from app.state_machine.states import ConversationState
+
+logger = logging.getLogger(__name__)
+
+
+class FollowUpWorker:
+    """
+    Polls the due sets, generates each follow-up through the orchestrator
+    (at most `concurrency` at a time) and commits it in one MULTI: history
+    message + outbox entry + ack. A job that fails is left un-acked and comes
+    back when its lease runs out.
+    """
+
+    def __init__(
+        self,
+        orchestrator: AsyncOrchestrator,
+        redis_service: AsyncRedisService,
+        scheduler: FollowUpScheduler,
+        session_store: SessionStore,
+        turn_lock: TurnLock,
+        batch_size: int = Config.FOLLOWUP_BATCH_SIZE,
+        concurrency: int = Config.FOLLOWUP_CONCURRENCY,
+        poll_interval: float = Config.FOLLOWUP_POLL_INTERVAL,
+    ):
+        self.orchestrator = orchestrator
+        self.redis_service = redis_service
+        self.scheduler = scheduler
+        self.session_store = session_store
+        self.turn_lock = turn_lock
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        # sent / superseded (user replied) / skipped (ended or expired) / failed
+        self.stats = Counter()
+
+    async def _send(self, job: FollowUpJob) -> None:
+        async with self._semaphore:
+            try:
+                # Same lock as a live turn, so a follow-up never interleaves with one
+                async with self.turn_lock.hold(job.user_id):
+                    if await self.scheduler.is_superseded(job):
+                        self.stats["superseded"] += 1
+                        await self.scheduler.ack(job)
+                        return
+
+                    session, history = await self.session_store.load(job.user_id)
+                    if session.state == ConversationState.END or not history:
+                        self.stats["skipped"] += 1
+                        await self.scheduler.ack(job)
+                        return
+
+                    reply = await self.orchestrator.followup_message(job.stage, session.state, history)
+
+                    pipe = self.redis_service.client.pipeline(transaction=True)
+                    self.redis_service.queue_message(pipe, job.user_id, "assistant", reply)
+                    self.scheduler.queue_outbox(pipe, job, reply, session.state)
+                    self.scheduler.queue_ack(pipe, job)
+                    await pipe.execute()
+                    self.stats["sent"] += 1
+            except TurnLockTimeout:
+                # The user is mid-turn; their commit reschedules them anyway
+                self.stats["superseded"] += 1
+                await self.scheduler.ack(job)
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"Follow-up {job.member} failed (will retry after the lease): {e}")
+
+    async def run_once(self) -> int:
+        """
+        One poll: requeue expired claims, then claim and send one batch per stage.
+        Returns the number of jobs handled.
+        """
+        requeued = await self.scheduler.requeue_expired()
+        if requeued:
+            logger.warning(f"Requeued {requeued} follow-ups whose lease expired")
+
+        handled = 0
+        for stage in self.scheduler.delays:
+            jobs = await self.scheduler.claim(stage, self.batch_size)
+            if jobs:
+                await asyncio.gather(*(self._send(job) for job in jobs))
+                handled += len(jobs)
+        return handled
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        stop = stop or asyncio.Event()
+        logger.info(f"Follow-up worker started (stages: {', '.join(self.scheduler.delays)})")
+        while not stop.is_set():
+            try:
+                handled = await self.run_once()
+            except Exception as e:
+                logger.error(f"Follow-up poll failed: {e}")
+                handled = 0
+            # A full batch means there is a backlog: poll again right away
+            if handled < self.batch_size:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+
+async def _main() -> None:
+    redis_service = AsyncRedisService()
+    scheduler = FollowUpScheduler(redis_service)
+    orchestrator = AsyncOrchestrator()
+    worker = FollowUpWorker(
+        orchestrator,
+        redis_service,
+        scheduler,
+        SessionStore(redis_service, followups=scheduler),
+        TurnLock(redis_service),
+    )
+    try:
+        await worker.run()
+    finally:
+        await orchestrator.close()
+        await redis_service.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
@@ -1,14 +1,59 @@
 # JamieBot/app/main.py
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
+from app.api import routes
 from app.api.routes import router
+from app.config import Config
+from app.services.prompt_registry import get_prompt_registry
+from app.warmup import warm
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # --- STARTUP ---
+    # No-op when the prefork server already warmed up before forking
+    app.state.warmup = warm()
+    # The hot-reload thread doesn't survive fork(); (re)start it in this process
+    get_prompt_registry().start()
+
+    followup_stop = asyncio.Event()
+    followup_task = None
+    # Claims are atomic, so every API worker process can safely run one
+    if Config.FOLLOWUP_IN_PROCESS and routes.followup_worker is not None:
+        followup_task = asyncio.create_task(routes.followup_worker.run(followup_stop))
+    elif routes.followups is not None:
+        logger.warning("Follow-ups are scheduled but not sent by this process; make sure python -m app.followup_worker is running")
+
+    app.state.ready = True
+    yield
+
+    # --- SHUTDOWN ---
+    # Fail readiness first so the load balancer stops sending new turns
+    app.state.ready = False
+    if followup_task is not None:
+        followup_stop.set()
+        await followup_task
+    if routes.summarizer is not None:
+        await routes.summarizer.drain()
+    # LLM backend (shared OpenAI/httpx clients), then the shared Redis pool
+    await routes.orchestrator.close()
+    await routes.redis_service.close()
+    get_prompt_registry().stop()
+    logger.info("Shutdown complete")
 
 app = FastAPI(
     title="Jamie AI Setter",
     description="State-driven AI Setter chatbot service",
     version="1.0.0",
+    lifespan=lifespan,
 )
+app.state.ready = False
 
 app.include_router(router)
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -16,3 +61,14 @@ app.mount("/static", StaticFiles(directory="app/static"), name="static")
 @app.get("/")
 async def read_root():
     return FileResponse("app/static/index.html")
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once this worker is warm and Redis answers, 503 otherwise"""
+    if not app.state.ready:
+        return JSONResponse({"status": "starting"}, status_code=503)
+    try:
+        await asyncio.wait_for(routes.redis_service.client.ping(), timeout=1.0)
+    except Exception as e:
+        return JSONResponse({"status": "redis unavailable", "detail": str(e)}, status_code=503)
+    return {"status": "ready", "pid": os.getpid(), "warmup": app.state.warmup}
@@ -1,38 +1,67 @@
 # JamieBot/app/orchestrator.py
-from typing import Dict, Optional, List
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, List, Tuple
 from app.state_machine.states import ConversationState
 from app.state_machine.transitions import determine_next_state
-from app.services.llm_service import LLMService
+from app.config import Config
+from app.services import metrics
+from app.services.llm_service import LLMService, AsyncLLMService, SINGLE_PASS, TWO_PASS
+from app.services.prompt_registry import PromptRegistry, get_prompt_registry
 from app.validators.safety_check import validate_safety
-from app.state_machine.exit_rules import normalize_text
+from app.state_machine.exit_rules import NormalizedMessage
 from app.routing.problem_inference import infer_problem_tag, ProblemTag
 from app.routing.product_catalog import get_product_for_problem
 
+logger = logging.getLogger(__name__)
+
+# States whose answer is classified by the LLM (state -> attribute type)
+EXTRACTION_STATES = {
+    ConversationState.STAGE_10_QUAL_LOCATION: "location",
+    ConversationState.STAGE_10_QUAL_FINANCE: "finance",
+}
+
+# Likely next state after an extraction stage. The async path drafts the reply for it
+# while the extraction call is still in flight and throws the draft away if the
+# answer routes elsewhere. (Finance always routes to a scripted reply, so it has none.)
+SPECULATIVE_NEXT_STATE = {
+    ConversationState.STAGE_10_QUAL_LOCATION: ConversationState.STAGE_10_QUAL_AGE,
+}
+
+# Stands in for the user's message on follow-ups (they haven't sent one)
+FOLLOWUP_USER_MESSAGE = "(no reply from the user yet)"
+
+def _discard(task: Optional[asyncio.Task]) -> None:
+    """
+    Cancels speculative work; a failure it already hit is retrieved and ignored.
+    """
+    if task is None:
+        return
+    task.cancel()
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
 class Orchestrator:
-    def __init__(self):
-        self.llm_service = LLMService()
+    def __init__(self, llm_service: Optional[LLMService] = None, prompts: Optional[PromptRegistry] = None):
+        self.llm_service = llm_service or LLMService()
+        self.prompts = prompts or get_prompt_registry()
+        # Scripted replies served instead of the LLM: timeouts (SLO missed) / errors
+        self.degradation_stats = Counter()
 
     def _load_prompt(self, filename: str) -> str:
-        try:
-            with open(f"app/prompts/{filename}", "r", encoding="utf-8") as file:
-                return file.read().strip()
-        except FileNotFoundError:
-            # Fallback for new stages if file missing
-            return "You are Jamie. Keep the conversation moving."
+        # Served from memory; missing files fall back and are counted by the registry
+        return self.prompts.get(filename)
 
-    def process_message(
+    def _guardrail_reply(
         self,
-        user_message: str,
+        message: NormalizedMessage,
         current_state: ConversationState,
-        extracted_attributes: Optional[Dict[str, any]] = None,
-        history: List[Dict] = [] 
-    ) -> Dict[str, any]:
-        
-        if extracted_attributes is None: extracted_attributes = {}
-        
+        extracted_attributes: Dict[str, any],
+    ) -> Optional[Dict[str, any]]:
         # --- 1. SAFETY GUARDRAIL ---
         # If unsafe, warn them, KEEP SAME STATE, DO NOT INCREMENT TURN COUNT.
-        if not validate_safety(user_message):
+        if not validate_safety(message):
             return {
                 "reply": "I’m not the right person for this. You can try OnlyFans for that 😂. Now..if you want help with a real dating strategy, I’m happy to help.",
                 "next_state": current_state.value, # Stay here
@@ -41,8 +70,8 @@ class Orchestrator:
 
         # --- 2. OFF-TOPIC GUARDRAIL (The Boomerang) ---
         # Check if user is asking "Who are you?" or "Is this AI?"
-        off_topic_response = self.llm_service.check_off_topic(user_message)
-        
+        off_topic_response = self.llm_service.check_off_topic(message)
+
         if off_topic_response:
             # Return off-topic answer, keep state, don't increment turn.
             return {
@@ -51,37 +80,48 @@ class Orchestrator:
                 "extracted_attributes": extracted_attributes # Turn count not touched
             }
 
-        # --- 3. NORMAL FLOW (The Funnel) ---
-        
-        # Get current turns
-        state_turn_count = extracted_attributes.get("current_state_turn_count", 0)
+        return None
 
-        # --- SEMANTIC EXTRACTION ---
+    def _store_extraction(
+        self,
+        current_state: ConversationState,
+        value: Optional[str],
+        extracted_attributes: Dict[str, any],
+    ) -> None:
+        if not value:
+            return
         if current_state == ConversationState.STAGE_10_QUAL_LOCATION:
-            loc = self.llm_service.extract_attribute(user_message, "location")
-            if loc: extracted_attributes["location_region"] = loc
-            
+            extracted_attributes["location_region"] = value
         elif current_state == ConversationState.STAGE_10_QUAL_FINANCE:
-            fin = self.llm_service.extract_attribute(user_message, "finance")
-            if fin: extracted_attributes["financial_bucket"] = fin.lower()
-            
-        elif current_state == ConversationState.STAGE_10_QUAL_AGE:
-            extracted_attributes["age"] = user_message 
+            extracted_attributes["financial_bucket"] = value.lower()
+
+    def _advance_state(
+        self,
+        message: NormalizedMessage,
+        current_state: ConversationState,
+        extracted_attributes: Dict[str, any],
+    ) -> ConversationState:
+        # Get current turns
+        state_turn_count = extracted_attributes.get("current_state_turn_count", 0)
+
+        if current_state == ConversationState.STAGE_10_QUAL_AGE:
+            extracted_attributes["age"] = message.raw
 
         # Always try to capture the problem in background if missing
         if "primary_problem" not in extracted_attributes:
-            normalized = normalize_text(user_message)
-            inferred_problem = infer_problem_tag(normalized)
+            inferred_problem = infer_problem_tag(message)
             if inferred_problem != ProblemTag.GENERAL:
                 extracted_attributes["primary_problem"] = inferred_problem
 
         # --- DETERMINE NEXT STATE ---
         next_state = determine_next_state(
             current_state=current_state,
-            user_message=user_message,
+            user_message=message,
             extracted_attributes=extracted_attributes,
         )
 
+        metrics.STATE_TRANSITIONS.inc(from_state=current_state.value, to_state=next_state.value)
+
         # --- TURN COUNT MANAGEMENT ---
         # Only increment if we actually processed a valid turn
         if next_state != current_state:
@@ -89,8 +129,15 @@ class Orchestrator:
         else:
             extracted_attributes["current_state_turn_count"] = state_turn_count + 1
 
+        return next_state
+
+    def _routing_reply(
+        self,
+        next_state: ConversationState,
+        extracted_attributes: Dict[str, any],
+    ) -> Optional[Dict[str, any]]:
         # --- 4. ROUTING LOGIC (RESTORED) ---
-        
+
         # HIGH TICKET (BOOKING LINK)
         if next_state == ConversationState.ROUTE_HIGH_TICKET:
             response_text = (
@@ -100,11 +147,11 @@ class Orchestrator:
                 "https://www.jamiedatecoaching.com/privatecoaching"
             )
             return {
-                "reply": response_text, 
-                "next_state": ConversationState.END.value, 
+                "reply": response_text,
+                "next_state": ConversationState.END.value,
                 "extracted_attributes": extracted_attributes
             }
-        
+
         # LOW TICKET (COURSE DOWNSELL)
         if next_state == ConversationState.ROUTE_LOW_TICKET:
             # 1. Resolve Problem Tag
@@ -116,37 +163,295 @@ class Orchestrator:
                 problem_tag = raw_tag
             else:
                 problem_tag = ProblemTag.GENERAL
-            
+
             # 2. Get Matching Product
             product = get_product_for_problem(problem_tag)
-            
+
             response_text = (
                 "Yeah private coaching might be out of budget right now, but I don’t want you leaving empty-handed.\n\n"
                 f"I’ve got a self-guided option that covers exactly this ({product.name}).\n\n"
                 f"You can check it out here (use code JDate10 for 10% off):\n{product.link}"
             )
             return {
-                "reply": response_text, 
-                "next_state": ConversationState.END.value, 
+                "reply": response_text,
+                "next_state": ConversationState.END.value,
                 "extracted_attributes": extracted_attributes
             }
 
         if next_state == ConversationState.END:
             return {"reply": "Got it. I’ll leave things there for now.", "next_state": next_state.value}
 
-        # --- 5. GENERATE LLM RESPONSE ---
+        return None
+
+    def _generation_strategy(self, next_state: ConversationState) -> str:
+        # Config.SINGLE_PASS_STATES skip the brain draft and go straight to the voice model
+        return SINGLE_PASS if next_state.value in Config.SINGLE_PASS_STATES else TWO_PASS
+
+    def _degraded_reply(self, next_state: ConversationState, reason: str, error: Optional[Exception] = None) -> str:
+        """
+        Pre-written reply for the state we already advanced to (app/prompts/fallbacks.json),
+        so the funnel keeps moving even when the LLM doesn't answer in time.
+        """
+        self.degradation_stats[reason] += 1
+        logger.warning(f"Degraded reply for {next_state.value} ({reason}: {error or 'SLO missed'})")
+        return self.prompts.degraded_reply(next_state).reply
+
+    def _state_prompts(self, next_state: ConversationState) -> tuple[str, str]:
         system_prompt = self._load_prompt("system.txt")
-        state_prompt = self._load_prompt(f"{next_state.value.lower()}.txt")
+        state_prompt = self.prompts.for_state(next_state)
+        return system_prompt, state_prompt
+
+    def process_message(
+        self,
+        user_message: str,
+        current_state: ConversationState,
+        extracted_attributes: Optional[Dict[str, any]] = None,
+        history: List[Dict] = []
+    ) -> Dict[str, any]:
+
+        if extracted_attributes is None: extracted_attributes = {}
+        # --- 1 & 2. GUARDRAILS ---
+        with metrics.span("guardrails"):
+            # Normalized + keyword-scanned once, shared by guardrails, transitions and inference
+            message = NormalizedMessage.from_text(user_message)
+            guardrail = self._guardrail_reply(message, current_state, extracted_attributes)
+        if guardrail:
+            return guardrail
+
+        # --- 3. NORMAL FLOW (The Funnel) ---
+
+        # --- SEMANTIC EXTRACTION ---
+        attribute_type = EXTRACTION_STATES.get(current_state)
+        if attribute_type:
+            with metrics.span("extraction"):
+                value = self.llm_service.extract_attribute(user_message, attribute_type)
+            self._store_extraction(current_state, value, extracted_attributes)
+
+        with metrics.span("transition"):
+            next_state = self._advance_state(message, current_state, extracted_attributes)
+
+        # --- 4. ROUTING LOGIC ---
+        routed = self._routing_reply(next_state, extracted_attributes)
+        if routed:
+            return routed
+
+        # --- 5. GENERATE LLM RESPONSE ---
+        system_prompt, state_prompt = self._state_prompts(next_state)
+
+        try:
+            with metrics.span("generation"):
+                response_text = self.llm_service.generate_response(
+                    system_prompt=system_prompt,
+                    state_prompt=state_prompt,
+                    user_message=user_message,
+                    history=history,
+                    strategy=self._generation_strategy(next_state),
+                )
+        except Exception as e:
+            # The blocking client can't be abandoned mid-call, so only failures degrade here
+            if not Config.DEGRADED_MODE:
+                raise
+            response_text = self._degraded_reply(next_state, "errors", e)
 
-        response_text = self.llm_service.generate_response(
+        return {
+            "reply": response_text,
+            "next_state": next_state.value,
+            "extracted_attributes": extracted_attributes,
+        }
+
+
+class AsyncOrchestrator(Orchestrator):
+    """
+    Same funnel as Orchestrator, but every LLM call is awaited on the event loop
+    instead of blocking a worker thread.
+    """
+
+    def __init__(self, llm_service: Optional[AsyncLLMService] = None, prompts: Optional[PromptRegistry] = None):
+        super().__init__(llm_service or AsyncLLMService(), prompts)
+        # hits = speculative draft used, misses = cancelled because the state went elsewhere
+        self.speculation_stats = Counter()
+
+    async def _plan_turn(
+        self,
+        user_message: str,
+        current_state: ConversationState,
+        extracted_attributes: Dict[str, any],
+        speculate: Optional[Callable[[ConversationState], Awaitable[str]]] = None,
+    ) -> Tuple[Optional[Dict[str, any]], ConversationState, Optional[asyncio.Task]]:
+        """
+        Everything before generation: guardrails, extraction, next state, routing.
+        Returns (scripted_result, next_state, speculative_reply_task).
+        scripted_result is set when no LLM reply is needed; the task is only
+        returned when it was started for the state we actually landed in.
+        """
+        # Guardrails are local checks, so they short-circuit before any LLM work starts
+        with metrics.span("guardrails"):
+            message = NormalizedMessage.from_text(user_message)
+            guardrail = self._guardrail_reply(message, current_state, extracted_attributes)
+        if guardrail:
+            return guardrail, current_state, None
+
+        # Independent steps run concurrently: extraction + draft for the likely next state
+        speculative_state = SPECULATIVE_NEXT_STATE.get(current_state) if speculate else None
+        speculative = asyncio.create_task(speculate(speculative_state)) if speculative_state else None
+
+        try:
+            attribute_type = EXTRACTION_STATES.get(current_state)
+            if attribute_type:
+                with metrics.span("extraction"):
+                    value = await self.llm_service.extract_attribute(user_message, attribute_type)
+                self._store_extraction(current_state, value, extracted_attributes)
+
+            with metrics.span("transition"):
+                next_state = self._advance_state(message, current_state, extracted_attributes)
+            scripted = self._routing_reply(next_state, extracted_attributes)
+        except BaseException:
+            _discard(speculative)
+            raise
+
+        if speculative is not None:
+            if scripted or next_state != speculative_state:
+                self.speculation_stats["misses"] += 1
+                _discard(speculative)
+                speculative = None
+            else:
+                self.speculation_stats["hits"] += 1
+
+        return scripted, next_state, speculative
+
+    async def _generate(self, next_state: ConversationState, user_message: str, history: List[Dict]) -> str:
+        system_prompt, state_prompt = self._state_prompts(next_state)
+        return await self.llm_service.generate_response(
             system_prompt=system_prompt,
             state_prompt=state_prompt,
             user_message=user_message,
-            history=history 
+            history=history,
+            strategy=self._generation_strategy(next_state),
         )
-        
+
+    async def _within_slo(self, next_state: ConversationState, pending: asyncio.Future, started: float) -> Optional[any]:
+        """
+        Waits for `pending` until the next state's SLO (counted from the start of the
+        turn) runs out. On a miss or an LLM error the work is cancelled and None is
+        returned, so the caller can serve the degraded reply instead.
+        """
+        if not Config.DEGRADED_MODE:
+            return await pending
+
+        remaining = self.prompts.degraded_reply(next_state).slo - (time.monotonic() - started)
+        try:
+            # wait_for cancels the late task, so the completion never lands after the fallback
+            return await asyncio.wait_for(pending, timeout=max(remaining, 0))
+        except asyncio.TimeoutError:
+            self._degraded_reply(next_state, "timeouts")
+        except Exception as e:
+            self._degraded_reply(next_state, "errors", e)
+        return None
+
+    async def process_message(
+        self,
+        user_message: str,
+        current_state: ConversationState,
+        extracted_attributes: Optional[Dict[str, any]] = None,
+        history: Optional[List[Dict]] = None
+    ) -> Dict[str, any]:
+
+        if extracted_attributes is None: extracted_attributes = {}
+        if history is None: history = []
+        started = time.monotonic()
+
+        scripted, next_state, speculative = await self._plan_turn(
+            user_message,
+            current_state,
+            extracted_attributes,
+            speculate=lambda state: self._generate(state, user_message, history),
+        )
+        if scripted:
+            return scripted
+
+        generation = speculative or asyncio.create_task(self._generate(next_state, user_message, history))
+        with metrics.span("generation"):
+            response_text = await self._within_slo(next_state, generation, started)
+        if response_text is None:
+            response_text = self.prompts.degraded_reply(next_state).reply
+
         return {
             "reply": response_text,
             "next_state": next_state.value,
             "extracted_attributes": extracted_attributes,
-        }
\ No newline at end of file
+        }
+
+    async def stream_message(
+        self,
+        user_message: str,
+        current_state: ConversationState,
+        extracted_attributes: Optional[Dict[str, any]] = None,
+        history: Optional[List[Dict]] = None
+    ) -> AsyncIterator[Tuple[str, any]]:
+        """
+        Streaming variant of process_message.
+        Yields ("delta", text) chunks of the reply, then one ("done", result)
+        carrying the same dict process_message would have returned.
+        The SLO applies to the first chunk: once text is on screen the reply is not swapped.
+        """
+        if extracted_attributes is None: extracted_attributes = {}
+        if history is None: history = []
+        started = time.monotonic()
+
+        scripted, next_state, _ = await self._plan_turn(user_message, current_state, extracted_attributes)
+        if scripted:
+            yield "delta", scripted["reply"]
+            yield "done", scripted
+            return
+
+        system_prompt, state_prompt = self._state_prompts(next_state)
+
+        chunks = self.llm_service.stream_response(
+            system_prompt=system_prompt,
+            state_prompt=state_prompt,
+            user_message=user_message,
+            history=history,
+            strategy=self._generation_strategy(next_state),
+        )
+        generation_started = time.perf_counter()
+        with metrics.span("generation_first_chunk"):
+            first = await self._within_slo(next_state, asyncio.ensure_future(anext(chunks)), started)
+        if first is None:
+            await chunks.aclose()
+            reply = self.prompts.degraded_reply(next_state).reply
+            yield "delta", reply
+        else:
+            parts = [first]
+            yield "delta", first
+            async for text in chunks:
+                parts.append(text)
+                yield "delta", text
+            # The done event carries the validated reply; clients redraw from it
+            reply = self.llm_service.finalize_streamed_reply("".join(parts))
+        metrics.TURN_STEP_SECONDS.observe(time.perf_counter() - generation_started, step="generation")
+
+        yield "done", {
+            "reply": reply,
+            "next_state": next_state.value,
+            "extracted_attributes": extracted_attributes,
+        }
+
+    async def followup_message(self, stage: str, current_state: ConversationState, history: List[Dict]) -> str:
+        """
+        Check-in for a user who stopped replying (app/prompts/followup_{stage}.txt),
+        written against the conversation so far. Errors propagate so the follow-up
+        worker can retry later instead of sending a scripted line out of the blue.
+        """
+        system_prompt = self._load_prompt("system.txt")
+        followup_prompt = self._load_prompt(f"followup_{stage}.txt")
+        with metrics.span("followup_generation"):
+            return await self.llm_service.generate_response(
+                system_prompt=system_prompt,
+                state_prompt=f"{followup_prompt}\n\n(The conversation was in {current_state.value} when they went quiet.)",
+                user_message=FOLLOWUP_USER_MESSAGE,
+                history=history,
+                strategy=SINGLE_PASS,
+            )
+
+    async def close(self):
+        await self.llm_service.close()
@@ -0,0 +1,203 @@
+# JamieBot/app/replay.py
+"""
+Batch conversation replay: drives scripted conversations through the full
+AsyncOrchestrator with bounded parallelism and streams per-turn results as JSONL.
+
+    python -m app.replay conversations.jsonl -o results.jsonl --concurrency 32
+
+Input lines are either whole conversations
+    {"conversation_id": "c1", "messages": ["hi", "not great"], "current_state": "ENTRY"}
+or single turns in the /process-message (AIRequest) shape, grouped by user_id
+in file order
+    {"user_id": "c1", "message": "hi"}
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+from app.config import Config
+from app.orchestrator import AsyncOrchestrator
+from app.state_machine.states import ConversationState
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Conversation:
+    conversation_id: str
+    messages: List[str]
+    start_state: ConversationState = ConversationState.ENTRY
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+def load_conversations(lines: Iterable[str]) -> List[Conversation]:
+    """
+    Parses replay JSONL. Blank lines are skipped; a malformed line raises ValueError.
+    """
+    conversations: Dict[str, Conversation] = {}
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {number}: invalid JSON ({e})")
+
+        if "messages" in row:
+            conversation_id = str(row.get("conversation_id") or row.get("user_id") or f"line-{number}")
+            messages = [str(m) for m in row["messages"]]
+        elif "message" in row and "user_id" in row:
+            conversation_id = str(row["user_id"])
+            messages = [str(row["message"])]
+        else:
+            raise ValueError(f"Line {number}: expected 'messages' or 'user_id' + 'message'")
+
+        conversation = conversations.get(conversation_id)
+        if conversation is None:
+            state = row.get("current_state") or ConversationState.ENTRY.value
+            if state not in ConversationState.__members__:
+                raise ValueError(f"Line {number}: invalid state {state}")
+            conversation = conversations[conversation_id] = Conversation(
+                conversation_id=conversation_id,
+                messages=[],
+                start_state=ConversationState[state],
+                attributes=dict(row.get("user_attributes") or {}),
+            )
+        conversation.messages.extend(messages)
+
+    return list(conversations.values())
+
+
+class ReplayRunner:
+    """
+    Replays conversations concurrently (at most `concurrency` at a time); turns
+    within one conversation run in order with in-memory history, so replays
+    never touch the Redis sessions of real users.
+    """
+
+    def __init__(self, orchestrator: AsyncOrchestrator, concurrency: int = Config.REPLAY_CONCURRENCY):
+        self.orchestrator = orchestrator
+        self.concurrency = max(1, concurrency)
+
+    async def replay_conversation(self, conversation: Conversation) -> AsyncIterator[Dict[str, Any]]:
+        state = conversation.start_state
+        attributes = dict(conversation.attributes)
+        history: List[Dict[str, str]] = []
+        started = time.perf_counter()
+        turns = 0
+        error: Optional[str] = None
+
+        for turn, message in enumerate(conversation.messages):
+            if state == ConversationState.END:
+                break
+            turn_started = time.perf_counter()
+            record = {
+                "type": "turn",
+                "conversation_id": conversation.conversation_id,
+                "turn": turn,
+                "message": message,
+                "state": state.value,
+            }
+            try:
+                window = history[-Config.HISTORY_WINDOW:] if Config.HISTORY_WINDOW else history
+                result = await self.orchestrator.process_message(
+                    user_message=message,
+                    current_state=state,
+                    extracted_attributes=attributes,
+                    history=window,
+                )
+            except Exception as e:
+                error = str(e)
+                record.update(error=error, latency_ms=round((time.perf_counter() - turn_started) * 1000, 1))
+                yield record
+                break
+
+            record.update(
+                next_state=result["next_state"],
+                reply=result["reply"],
+                latency_ms=round((time.perf_counter() - turn_started) * 1000, 1),
+            )
+            yield record
+
+            turns += 1
+            state = ConversationState(result["next_state"])
+            attributes = result.get("extracted_attributes") or attributes
+            history += [{"role": "user", "content": message}, {"role": "assistant", "content": result["reply"]}]
+
+        yield {
+            "type": "conversation",
+            "conversation_id": conversation.conversation_id,
+            "turns": turns,
+            "final_state": state.value,
+            "attributes": attributes,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "error": error,
+        }
+
+    async def run(self, conversations: Iterable[Conversation]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields records as soon as each turn finishes (interleaved across conversations).
+        """
+        pending: "asyncio.Queue[Optional[Conversation]]" = asyncio.Queue()
+        results: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(maxsize=self.concurrency * 4)
+        for conversation in conversations:
+            pending.put_nowait(conversation)
+
+        async def worker():
+            while not pending.empty():
+                conversation = pending.get_nowait()
+                async for record in self.replay_conversation(conversation):
+                    await results.put(record)
+            await results.put(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, pending.qsize()) or 1)]
+        try:
+            remaining = len(workers)
+            while remaining:
+                record = await results.get()
+                if record is None:
+                    remaining -= 1
+                    continue
+                yield record
+        finally:
+            for task in workers:
+                task.cancel()
+
+
+async def _main(args: argparse.Namespace) -> None:
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    with source:
+        conversations = load_conversations(source)
+
+    orchestrator = AsyncOrchestrator()
+    runner = ReplayRunner(orchestrator, concurrency=args.concurrency)
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    started = time.perf_counter()
+    finished = 0
+    try:
+        async for record in runner.run(conversations):
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+            if record["type"] == "conversation":
+                finished += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        await orchestrator.close()
+
+    logger.info(f"Replayed {finished} conversations in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay scripted conversations through the orchestrator")
+    parser.add_argument("input", help="conversations JSONL ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="results JSONL ('-' for stdout)")
+    parser.add_argument("-c", "--concurrency", type=int, default=Config.REPLAY_CONCURRENCY)
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,130 @@
+# JamieBot/app/routing/attribute_rules.py
+import re
+from typing import Dict, Optional, Set
+from app.state_machine.exit_rules import normalize_text
+
+# Local lexicon for extract_attribute.
+# Only unambiguous answers are resolved here; everything else goes to the LLM.
+
+LOCATION_ALIASES = {
+    # No bare "us" / "states": "just us two", "states of mind"
+    "US": {
+        "usa", "u s", "u s a", "united states", "america", "the states",
+        "nyc", "los angeles", "chicago", "miami", "seattle", "boston", "atlanta",
+        # Multiword states must be aliases themselves, or "new mexico" reads as Mexico
+        "new york", "new jersey", "new mexico", "new hampshire", "north carolina",
+        "south carolina", "north dakota", "south dakota", "west virginia", "rhode island",
+        "alabama", "alaska", "arizona", "arkansas", "california", "colorado", "connecticut",
+        "delaware", "florida", "hawaii", "idaho", "illinois", "indiana", "iowa",
+        "kansas", "kentucky", "louisiana", "maine", "maryland", "massachusetts", "michigan",
+        "minnesota", "mississippi", "missouri", "montana", "nebraska", "nevada", "ohio",
+        "oklahoma", "oregon", "pennsylvania", "tennessee", "texas", "utah", "vermont",
+        "virginia", "wisconsin", "wyoming",
+    },
+    "CANADA": {
+        "canada", "canadian", "toronto", "vancouver", "montreal", "calgary", "ottawa",
+        "ontario", "quebec", "alberta", "british columbia",
+    },
+    "EU": {
+        "uk", "u k", "united kingdom", "england", "britain", "great britain", "london",
+        "scotland", "wales", "ireland", "europe", "eu", "germany", "france", "italy",
+        "spain", "portugal", "netherlands", "holland", "belgium", "sweden", "norway",
+        "denmark", "finland", "poland", "austria", "switzerland", "greece", "berlin",
+        "paris", "madrid", "amsterdam", "dublin", "manchester",
+    },
+    "OTHER": {
+        "australia", "new zealand", "india", "pakistan", "bangladesh", "philippines",
+        "indonesia", "malaysia", "singapore", "japan", "china", "korea", "vietnam",
+        "thailand", "nigeria", "kenya", "ghana", "south africa", "egypt", "brazil",
+        "mexico", "argentina", "colombia", "chile", "peru", "dubai", "uae", "saudi",
+        "asia", "africa", "south america", "latin america", "middle east",
+    },
+}
+
+FINANCE_ALIASES = {
+    "LOW": {
+        "broke", "paycheck to paycheck", "struggling", "student", "no money", "tight",
+        "unemployed", "no job", "jobless", "in debt", "can't afford", "cant afford",
+        "barely", "poor",
+    },
+    # No bare "good" / "fine" / "great": "good question", "fine I guess"
+    "HIGH": {
+        "doing well", "doing good", "doing great", "comfortable", "savings", "invest", "investing",
+        "happy with it", "stable", "money is fine", "money's fine", "solid", "well off",
+        "can afford", "no problem",
+    },
+}
+
+# Aliases that would be read as the wrong place ("north america" is not just the US,
+# "new england" is not England, Georgia is a state and a country): always ask the LLM
+AMBIGUOUS_ALIASES = {
+    "location": {"north america", "central america", "new england", "georgia"},
+}
+
+# Case-sensitive checks on the raw answer: "US" is the country, "us" usually isn't
+RAW_PATTERNS = {
+    "location": (re.compile(r"\bUS\b"), "US"),
+}
+
+# Answers that contain a negation but are still unambiguous; matched before NEGATION_PATTERN
+NEGATED_ALIASES = {
+    "finance": {
+        "LOW": {"not much", "not a lot", "not enough"},
+    },
+}
+
+# "not doing well" must not resolve to HIGH; any negation sends the answer to the LLM
+NEGATION_PATTERN = re.compile(r"\b(not|never|isn't|isnt|aren't|wasn't|don't|dont|no longer)\b")
+
+def _compile(aliases: Dict[str, Set[str]], ambiguous: Set[str] = frozenset()) -> tuple[re.Pattern, Dict[str, Optional[str]]]:
+    """
+    One alternation per attribute, longest alias first so "south america"
+    wins over "america" at the same position. Ambiguous aliases map to None.
+    """
+    label_by_alias: Dict[str, Optional[str]] = {alias: label for label, words in aliases.items() for alias in words}
+    label_by_alias.update(dict.fromkeys(ambiguous))
+    ordered = sorted(label_by_alias, key=len, reverse=True)
+    pattern = re.compile(r"\b(" + "|".join(re.escape(a) for a in ordered) + r")\b")
+    return pattern, label_by_alias
+
+ATTRIBUTE_RULES = {
+    "location": _compile(LOCATION_ALIASES, AMBIGUOUS_ALIASES["location"]),
+    "finance": _compile(FINANCE_ALIASES),
+}
+NEGATED_RULES = {attribute: _compile(aliases) for attribute, aliases in NEGATED_ALIASES.items()}
+
+# Attribute types where a negation makes the answer ambiguous
+NEGATION_SENSITIVE = {"finance"}
+
+def classify_attribute(text: str, attribute_type: str) -> Optional[str]:
+    """
+    Deterministic classifier tier in front of the LLM extractor.
+    Returns a label only when exactly one category matched; None means "ask the LLM".
+    """
+    rules = ATTRIBUTE_RULES.get(attribute_type)
+    if rules is None:
+        return None
+
+    normalized = normalize_text(text)
+    labels = _labels(rules, normalized)
+    raw = RAW_PATTERNS.get(attribute_type)
+    if raw is not None and raw[0].search(text or ""):
+        labels.add(raw[1])
+
+    negated = NEGATED_RULES.get(attribute_type)
+    if negated is not None:
+        negated_labels = _labels(negated, normalized)
+        if negated_labels:
+            # "not much to complain about, doing well": negated alias + another label
+            labels |= negated_labels
+            return labels.pop() if len(labels) == 1 else None
+    if attribute_type in NEGATION_SENSITIVE and NEGATION_PATTERN.search(normalized):
+        return None
+    if len(labels) != 1:
+        return None
+    return labels.pop()
+
+def _labels(rules: tuple[re.Pattern, Dict[str, Optional[str]]], normalized: str) -> Set[Optional[str]]:
+    pattern, label_by_alias = rules
+    return {label_by_alias[m] for m in pattern.findall(normalized)}
+
@@ -0,0 +1,171 @@
+# JamieBot/app/routing/keyword_matcher.py
+from collections import deque
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Mapping, Tuple
+from app.routing.keywords import (
+    PROBLEM_KEYWORDS,
+    ABUSIVE_KEYWORDS,
+    DATING_KEYWORDS,
+    UNSAFE_KEYWORDS,
+    IDENTITY_PHRASES,
+    WHY_PHRASES,
+    STEM_EXCEPTIONS,
+)
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+# Endings accepted after keywords of inflected categories ("text" -> "texted"), longest first
+INFLECTION_SUFFIXES = ("ing", "ers", "es", "ed", "er", "ly", "s", "d")
+
+def _inflected_end(text: str, end: int) -> int:
+    """
+    End of the word if text[end:] is one inflection suffix, else -1.
+    """
+    for suffix in INFLECTION_SUFFIXES:
+        stop = end + len(suffix)
+        if text.startswith(suffix, end) and (stop == len(text) or not _is_word_char(text[stop])):
+            return stop
+    return -1
+
+def _word_start(text: str, index: int) -> int:
+    while index > 0 and _is_word_char(text[index - 1]):
+        index -= 1
+    return index
+
+def _word_end(text: str, index: int) -> int:
+    while index < len(text) and _is_word_char(text[index]):
+        index += 1
+    return index
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over every keyword set, built once.
+    One left-to-right pass over the text reports all matching categories.
+    Matches must sit on word boundaries, so "die" does not fire on "diet";
+    keywords of the `inflected` categories may also end in one of
+    INFLECTION_SUFFIXES ("kiss" -> "kissing", "relationship" -> "relationships").
+    A "*" on either end of a keyword lifts that boundary ("porn*", "*fuck*");
+    whole words in `exceptions` never count as such a match.
+    """
+
+    def __init__(
+        self,
+        categories: Mapping[str, Iterable[str]],
+        inflected: Iterable[str] = (),
+        exceptions: Iterable[str] = (),
+    ):
+        self._inflected = frozenset(inflected)
+        self._exceptions = frozenset(exceptions)
+        # Node 0 is the root. goto[node][char] -> node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Keywords ending at a node: (keyword length, category, open start, open end)
+        self._out: List[List[Tuple[int, str, bool, bool]]] = [[]]
+
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                open_start, open_end = keyword.startswith("*"), keyword.endswith("*")
+                keyword = " ".join(keyword.strip("*").lower().split())
+                self._add(keyword, category, open_start, open_end)
+        self._link()
+
+    def _add(self, keyword: str, category: str, open_start: bool = False, open_end: bool = False) -> None:
+        node = 0
+        for char in keyword:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(keyword), category, open_start, open_end))
+
+    def _link(self) -> None:
+        # Breadth-first failure links; outputs are merged along them
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def __len__(self) -> int:
+        # Number of automaton states
+        return len(self._goto)
+
+    def find_all(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Yields (start, end, category) for every whole-word match in text.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        size = len(text)
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not out[node]:
+                continue
+            end = index + 1
+            bounded = end == size or not _is_word_char(text[end])
+            inflected_end = -2  # computed on first need
+            for length, category, open_start, open_end in out[node]:
+                start = end - length
+                if start > 0 and _is_word_char(text[start - 1]):
+                    if not open_start:
+                        continue
+                    start = _word_start(text, start)
+                if open_start or open_end:
+                    stop = end if bounded else _word_end(text, end) if open_end else -1
+                    if stop > 0 and text[start:stop] not in self._exceptions:
+                        yield start, stop, category
+                elif bounded:
+                    yield start, end, category
+                elif category in self._inflected:
+                    if inflected_end == -2:
+                        inflected_end = _inflected_end(text, end)
+                    if inflected_end > 0:
+                        yield start, inflected_end, category
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        """
+        All categories with at least one keyword in text.
+        """
+        return frozenset(category for _, _, category in self.find_all(text))
+
+
+# Categories of the shared automaton
+PROBLEM_CATEGORY = "problem:{}"
+ABUSIVE = "abusive"
+DATING = "dating"
+UNSAFE = "unsafe"
+IDENTITY = "identity"
+WHY = "why"
+
+KEYWORD_MATCHER = KeywordAutomaton({
+    **{PROBLEM_CATEGORY.format(tag): words for tag, words in PROBLEM_KEYWORDS.items()},
+    ABUSIVE: ABUSIVE_KEYWORDS,
+    DATING: DATING_KEYWORDS,
+    UNSAFE: UNSAFE_KEYWORDS,
+    IDENTITY: IDENTITY_PHRASES,
+    WHY: WHY_PHRASES,
+}, inflected=[
+    # Topic words take their inflections; abuse/safety lists spell out their stems
+    *(PROBLEM_CATEGORY.format(tag) for tag in PROBLEM_KEYWORDS),
+    DATING,
+], exceptions=STEM_EXCEPTIONS)
+
+@lru_cache(maxsize=1024)
+def scan_keywords(normalized_text: str) -> FrozenSet[str]:
+    """
+    Categories found in a normalized message. Cached, so the guardrails,
+    transitions and inference that look at the same message share one pass.
+    """
+    return KEYWORD_MATCHER.scan(normalized_text)
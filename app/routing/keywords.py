@@ -0,0 +1,120 @@
+# JamieBot/app/routing/keywords.py
+# Keyword sets used by the text classifiers.
+# They are all compiled into one automaton in keyword_matcher.py, which matches
+# whole words/phrases. Problem and dating keywords also match with a regular
+# ending (-s, -ed, -ing, ...). Abusive/unsafe words use explicit stems instead:
+# "porn*" matches any word starting with "porn", "*fuck*" any word containing
+# "fuck" (minus STEM_EXCEPTIONS); words without a "*" only match exactly, which
+# keeps "die" out of "diet" and "kill" out of "skill".
+
+# --- PROBLEM INFERENCE (problem_inference.py) ---
+TEXTING_KEYWORDS = {
+    "texting",
+    "text",
+    "texts",
+    "messages",
+    "messaging",
+    "what to say",
+    "conversation fizzle",
+    "reply",
+}
+
+MATCHES_KEYWORDS = {
+    "matches",
+    "no matches",
+    "dating apps",
+    "tinder",
+    "hinge",
+    "bumble",
+    "profile",
+    "bio",
+}
+
+APPROACH_KEYWORDS = {
+    "approach",
+    "approaching",
+    "in person",
+    "real life",
+    "cold approach",
+    "social anxiety",
+    "nervous",
+}
+
+SPARK_KEYWORDS = {
+    "no spark",
+    "friend zone",
+    "friends",
+    "chemistry",
+    "attraction",
+    "too nice",
+}
+
+ESCALATION_KEYWORDS = {
+    "escalate",
+    "physical",
+    "kiss",
+    "touch",
+    "sexual",
+    "make a move",
+}
+
+CONFIDENCE_KEYWORDS = {
+    "confidence",
+    "self doubt",
+    "feel stuck",
+    "insecure",
+    "not good enough",
+    "lost",
+}
+
+# Priority order matters: the first tag that matches wins
+PROBLEM_KEYWORDS = {
+    "TEXTING": TEXTING_KEYWORDS,
+    "MATCHES": MATCHES_KEYWORDS,
+    "APPROACH": APPROACH_KEYWORDS,
+    "SPARK": SPARK_KEYWORDS,
+    "ESCALATION": ESCALATION_KEYWORDS,
+    "CONFIDENCE": CONFIDENCE_KEYWORDS,
+}
+
+# --- ENTRY RULES (exit_rules.py) ---
+ABUSIVE_KEYWORDS = {
+    "*fuck*", "fuckin", "fck", "fk off",
+    "bitch*", "slut*", "whore*",
+    "*asshole*", "dumbass*",
+    "retard*", "nigger*", "rape", "raped", "rapist",
+    "kill", "die", "kys", "go die",
+}
+
+DATING_KEYWORDS = {
+    "date", "dates", "dating", "love life", "girlfriend", "boyfriend",
+    "single", "matches", "tinder", "hinge", "bumble", "ghosted",
+    "relationship", "hookups", "talking stage", "help", "advice"
+}
+
+# --- SAFETY (safety_check.py) ---
+UNSAFE_KEYWORDS = {
+    "nude*",
+    "nudity",
+    "sex*",
+    "onlyfans",
+    "explicit",
+    "porn*",
+    "hookup*",
+}
+
+# Words a stem above would catch that are not abuse / unsafe
+STEM_EXCEPTIONS = {
+    "sextant", "sextants", "sextet", "sextets", "sexton", "sextons",
+    "sexist", "sexists", "sexism",
+    "retardant", "retardants",
+}
+
+# --- OFF-TOPIC (LLMService.check_off_topic) ---
+IDENTITY_PHRASES = {
+    "are you real", "are you really jamie", "is this a bot", "is this ai", "who is this", "are you human",
+}
+
+WHY_PHRASES = {
+    "why are you asking", "why do you need to know",
+}
@@ -1,5 +1,10 @@
 # JamieBot/app/routing/problem_inference.py
 from enum import Enum
+from typing import TYPE_CHECKING, Union
+from app.routing.keyword_matcher import PROBLEM_CATEGORY, scan_keywords
+
+if TYPE_CHECKING:
+    from app.state_machine.exit_rules import NormalizedMessage
 
 class ProblemTag(str, Enum):
     TEXTING = "TEXTING"
@@ -10,89 +15,27 @@ class ProblemTag(str, Enum):
     CONFIDENCE = "CONFIDENCE"
     GENERAL = "GENERAL"
 
-# Keyword Signals
-
-TEXTING_KEYWORDS = {
-    "texting",
-    "text",
-    "messages",
-    "messaging",
-    "what to say",
-    "conversation fizzle",
-    "reply",
-}
-
-MATCHES_KEYWORDS = {
-    "matches",
-    "no matches",
-    "dating apps",
-    "tinder",
-    "hinge",
-    "bumble",
-    "profile",
-    "bio",
-}
-
-APPROACH_KEYWORDS = {
-    "approach",
-    "approaching",
-    "in person",
-    "real life",
-    "cold approach",
-    "social anxiety",
-    "nervous",
-}
-
-SPARK_KEYWORDS = {
-    "no spark",
-    "friend zone",
-    "friends",
-    "chemistry",
-    "attraction",
-    "too nice",
-}
-
-ESCALATION_KEYWORDS = {
-    "escalate",
-    "physical",
-    "kiss",
-    "touch",
-    "sexual",
-    "make a move",
-}
-
-CONFIDENCE_KEYWORDS = {
-    "confidence",
-    "self doubt",
-    "feel stuck",
-    "insecure",
-    "not good enough",
-    "lost",
-}
+# Keyword signals live in app/routing/keywords.py; checked in this priority order
+PROBLEM_PRIORITY = [
+    ProblemTag.TEXTING,
+    ProblemTag.MATCHES,
+    ProblemTag.APPROACH,
+    ProblemTag.SPARK,
+    ProblemTag.ESCALATION,
+    ProblemTag.CONFIDENCE,
+]
 
 # Inference Function
-def infer_problem_tag(text: str) -> ProblemTag:
+def infer_problem_tag(text: Union[str, "NormalizedMessage"]) -> ProblemTag:
     """
-    Infers the primary dating problem from normalized user text.
+    Infers the primary dating problem from normalized user text
+    (or the turn's NormalizedMessage, reusing its keyword scan).
     Returns exactly ONE ProblemTag.
     """
-    
-    if any(k in text for k in TEXTING_KEYWORDS):
-        return ProblemTag.TEXTING
-    
-    if any(k in text for k in MATCHES_KEYWORDS):
-        return ProblemTag.MATCHES
-    
-    if any(k in text for k in APPROACH_KEYWORDS):
-        return ProblemTag.APPROACH
-    
-    if any(k in text for k in SPARK_KEYWORDS):
-        return ProblemTag.SPARK
-    
-    if any(k in text for k in ESCALATION_KEYWORDS):
-        return ProblemTag.ESCALATION
-    
-    if any(k in text for k in CONFIDENCE_KEYWORDS):
-        return ProblemTag.CONFIDENCE
-    
+    matched = scan_keywords(text) if isinstance(text, str) else text.categories
+
+    for tag in PROBLEM_PRIORITY:
+        if PROBLEM_CATEGORY.format(tag.value) in matched:
+            return tag
+
     return ProblemTag.GENERAL
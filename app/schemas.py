@@ -1,6 +1,6 @@
 # JamieBot/app/schemas.py
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 # INPUT SCHEMA (Request)
 class AIRequest(BaseModel):
@@ -10,10 +10,13 @@ class AIRequest(BaseModel):
     """
     user_id: str = Field(..., description="Unique identifier for the user")
     message: str = Field(..., description="Latest message sent by the user")
-    current_state: str = Field(..., description="Current conversation state (e.g., RAPPORT, QUAL_LOCATION)")
+    current_state: Optional[str] = Field(
+        default=None,
+        description="Current conversation state (e.g., RAPPORT, QUAL_LOCATION). Omit to use the server-side session"
+    )
     user_attributes: Optional[Dict[str, Any]] = Field(
         default=None,
-        description="Collected user attributes"
+        description="Collected user attributes. Omit to use the server-side session"
     )
 
 # OUTPUT SCHEMA (Response)
@@ -27,3 +30,23 @@ class AIResponse(BaseModel):
         default=None,
         description="New user attributes"
     )
+
+# BATCH SCHEMAS (/process-messages)
+class AIBatchRequest(BaseModel):
+    """
+    Several turns relayed at once. Turns for the same user_id run in list order.
+    """
+    items: List[AIRequest] = Field(..., min_length=1, description="Turns to process")
+
+class AIBatchItem(BaseModel):
+    """
+    Outcome of one turn in a batch: `response` on success, `error` + `status` otherwise.
+    """
+    index: int = Field(..., description="Position of the turn in the request")
+    user_id: str
+    status: int = Field(..., description="HTTP status /process-message would have returned")
+    response: Optional[AIResponse] = None
+    error: Optional[str] = None
+
+class AIBatchResponse(BaseModel):
+    results: List[AIBatchItem] = Field(..., description="One entry per request item, in request order")
@@ -0,0 +1,152 @@
+# JamieBot/app/server.py
+"""
+Production entry point: warm once, then prefork uvicorn workers.
+
+    python -m app.server --workers 4 --port 8000
+
+The parent imports the app and builds every read-only structure (prompts,
+transition table, keyword automaton, product catalog, LLM backend setup),
+binds the listening socket, then forks. Workers inherit all of it
+copy-on-write and only open their own connections (Redis pool, OpenAI
+client) lazily after the fork. Dead workers are replaced; SIGTERM / SIGINT
+drain every worker and exit.
+
+Metrics are per worker: worker N also serves /metrics on METRICS_PORT + N,
+and Prometheus has to scrape all of them (a scrape of PORT hits one worker).
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+import uvicorn
+from app.config import Config
+from app.services import metrics
+from app.warmup import warm
+
+logger = logging.getLogger(__name__)
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    def __init__(self, app, workers: int, host: str, port: int, graceful_timeout: float = Config.GRACEFUL_TIMEOUT):
+        self.app = app
+        self.workers = max(1, workers)
+        self.host = host
+        self.port = port
+        self.graceful_timeout = graceful_timeout
+        self.children: Dict[int, int] = {}  # pid -> worker number
+        self.stopping = False
+
+    def _serve(self, sock: socket.socket, number: int) -> None:
+        # Child: default signal handling back on, uvicorn installs its own graceful ones
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        config = uvicorn.Config(
+            self.app,
+            lifespan="on",
+            timeout_graceful_shutdown=int(self.graceful_timeout),
+            log_config=None,
+        )
+        if Config.METRICS_PORT:
+            try:
+                metrics.serve_metrics(self.host, Config.METRICS_PORT + number)
+            except OSError as e:
+                logger.warning(f"Worker {number}: metrics port {Config.METRICS_PORT + number} unavailable: {e}")
+        logger.info(f"Worker {number} started (pid {os.getpid()})")
+        uvicorn.Server(config).run(sockets=[sock])
+
+    def _spawn(self, sock: socket.socket, number: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._serve(sock, number)
+            except BaseException as e:
+                logger.error(f"Worker {number} crashed: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = number
+
+    def _stop(self, signum, frame) -> None:
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info(f"Stopping {len(self.children)} workers")
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        # --- 1. WARM (shared read-only state, built once) ---
+        stats = warm()
+        sock = _bind(self.host, self.port)
+        # Objects that exist now are never collected again, so the GC doesn't
+        # touch (and un-share) their pages in every worker
+        gc.freeze()
+        logger.info(f"Prefork on {self.host}:{self.port} with {self.workers} workers (warm: {stats})")
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        # --- 2. FORK ---
+        for number in range(self.workers):
+            self._spawn(sock, number)
+
+        # --- 3. SUPERVISE ---
+        deadline = None
+        while self.children:
+            if self.stopping:
+                deadline = deadline or time.monotonic() + self.graceful_timeout + 5
+                if time.monotonic() > deadline:
+                    for pid in self.children:
+                        os.kill(pid, signal.SIGKILL)
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(0.2)
+                continue
+
+            number = self.children.pop(pid, None)
+            if number is None or self.stopping:
+                continue
+            logger.warning(f"Worker {number} (pid {pid}) exited with status {status}, restarting")
+            time.sleep(1)  # don't spin if workers die on startup
+            self._spawn(sock, number)
+
+        sock.close()
+        logger.info("All workers stopped")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Jamie AI Setter API (prefork)")
+    parser.add_argument("-w", "--workers", type=int, default=Config.WEB_CONCURRENCY)
+    parser.add_argument("--host", default=Config.HOST)
+    parser.add_argument("--port", type=int, default=Config.PORT)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr, format="%(asctime)s %(process)d %(name)s %(levelname)s %(message)s")
+
+    # Importing the app builds the routes' services (nothing connects until first use)
+    from app.main import app
+    PreforkServer(app, args.workers, args.host, args.port).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# JamieBot/app/services/followups.py
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from app.config import Config
+from app.services.redis_service import AsyncRedisService
+from app.state_machine.states import ConversationState
+
+DUE_PREFIX = "jamie_followups:"
+PROCESSING_KEY = "jamie_followups_processing"
+ATTEMPTS_KEY = "jamie_followups_attempts"
+OUTBOX_KEY = "jamie_outbox"
+
+# Move up to ARGV[2] due users into the processing set under a lease, in one step,
+# so two workers can never claim the same follow-up.
+CLAIM_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, user_id in ipairs(due) do
+    redis.call('ZREM', KEYS[1], user_id)
+    redis.call('ZADD', KEYS[2], ARGV[3], ARGV[4] .. ':' .. user_id)
+end
+return due
+"""
+
+# Claims whose lease ran out (worker died / generation failed) go back to their
+# due set, until they have been tried ARGV[2] times. Every key the script touches
+# comes in through KEYS (Redis Cluster / key-prefixing proxies): KEYS[3..] are the
+# due sets of the stages named in ARGV[4..], in the same order.
+REQUEUE_SCRIPT = """
+local due = {}
+for i = 3, #KEYS do
+    due[ARGV[i + 1]] = KEYS[i]
+end
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[3])
+local requeued = 0
+for _, member in ipairs(expired) do
+    redis.call('ZREM', KEYS[1], member)
+    local attempts = redis.call('HINCRBY', KEYS[2], member, 1)
+    local sep = string.find(member, ':', 1, true)
+    local due_key = due[string.sub(member, 1, sep - 1)]
+    if due_key and attempts < tonumber(ARGV[2]) then
+        redis.call('ZADD', due_key, 'NX', ARGV[1], string.sub(member, sep + 1))
+        requeued = requeued + 1
+    else
+        redis.call('HDEL', KEYS[2], member)
+    end
+end
+return requeued
+"""
+
+
+@dataclass
+class FollowUpJob:
+    stage: str
+    user_id: str
+
+    @property
+    def member(self) -> str:
+        return f"{self.stage}:{self.user_id}"
+
+
+class FollowUpScheduler:
+    """
+    Tracks idle conversations in one Redis sorted set per follow-up stage
+    (jamie_followups:{stage}, member = user_id, score = when it is due).
+
+    Every committed turn re-scores the user in each set (queue_activity runs
+    inside SessionStore.commit's transaction), so only the latest activity
+    counts. Workers claim due users by score range, never by scanning keys,
+    so cost is O(log N + batch) no matter how many sessions are idle.
+    """
+
+    def __init__(
+        self,
+        redis_service: AsyncRedisService,
+        delays: Optional[Dict[str, int]] = None,
+        lease_seconds: int = Config.FOLLOWUP_LEASE,
+        max_attempts: int = Config.FOLLOWUP_MAX_ATTEMPTS,
+    ):
+        self.redis_service = redis_service
+        self.client = redis_service.client
+        self.delays = delays or Config.FOLLOWUP_DELAYS
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._claim = self.client.register_script(CLAIM_SCRIPT)
+        self._requeue = self.client.register_script(REQUEUE_SCRIPT)
+
+    def due_key(self, stage: str) -> str:
+        return f"{DUE_PREFIX}{stage}"
+
+    # --- SCHEDULING (request path) ---
+    def queue_activity(self, pipe, user_id: str, state: ConversationState, now: Optional[float] = None) -> None:
+        """
+        Adds the (re)scheduling commands to an open pipeline / MULTI.
+        Finished conversations get no follow-ups.
+        """
+        now = time.time() if now is None else now
+        for stage, delay in self.delays.items():
+            if state == ConversationState.END:
+                pipe.zrem(self.due_key(stage), user_id)
+            else:
+                pipe.zadd(self.due_key(stage), {user_id: now + delay})
+
+    async def cancel(self, user_id: str) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for stage in self.delays:
+            pipe.zrem(self.due_key(stage), user_id)
+        await pipe.execute()
+
+    # --- WORKER SIDE ---
+    async def claim(self, stage: str, batch_size: int, now: Optional[float] = None) -> List[FollowUpJob]:
+        now = time.time() if now is None else now
+        user_ids = await self._claim(
+            keys=[self.due_key(stage), PROCESSING_KEY],
+            args=[now, batch_size, now + self.lease_seconds, stage],
+        )
+        return [FollowUpJob(stage=stage, user_id=user_id) for user_id in user_ids]
+
+    async def requeue_expired(self, now: Optional[float] = None, limit: int = 1000) -> int:
+        now = time.time() if now is None else now
+        stages = list(self.delays)
+        return int(await self._requeue(
+            keys=[PROCESSING_KEY, ATTEMPTS_KEY, *(self.due_key(stage) for stage in stages)],
+            args=[now, self.max_attempts, limit, *stages],
+        ))
+
+    async def is_superseded(self, job: FollowUpJob) -> bool:
+        # The user wrote again after the claim: their commit re-added them to the due set
+        return await self.client.zscore(self.due_key(job.stage), job.user_id) is not None
+
+    def queue_ack(self, pipe, job: FollowUpJob) -> None:
+        pipe.zrem(PROCESSING_KEY, job.member)
+        pipe.hdel(ATTEMPTS_KEY, job.member)
+
+    async def ack(self, job: FollowUpJob) -> None:
+        pipe = self.client.pipeline(transaction=True)
+        self.queue_ack(pipe, job)
+        await pipe.execute()
+
+    def queue_outbox(self, pipe, job: FollowUpJob, reply: str, state: ConversationState) -> None:
+        # Delivery is the backend's job: it reads jamie_outbox (XREAD / consumer group)
+        pipe.xadd(
+            OUTBOX_KEY,
+            {"user_id": job.user_id, "stage": job.stage, "state": state.value, "reply": reply},
+            maxlen=Config.FOLLOWUP_OUTBOX_MAXLEN,
+            approximate=True,
+        )
+
+    async def stats(self) -> Dict[str, int]:
+        pipe = self.client.pipeline(transaction=False)
+        for stage in self.delays:
+            pipe.zcard(self.due_key(stage))
+        pipe.zcard(PROCESSING_KEY)
+        counts = await pipe.execute()
+        return {**{f"scheduled_{stage}": n for stage, n in zip(self.delays, counts)}, "processing": counts[-1]}
@@ -0,0 +1,61 @@
+# JamieBot/app/services/history_codec.py
+"""
+Wire format of one chat history entry (an item of the jamie_chat:{user_id} list).
+
+    byte 0     format: 0x01 = UTF-8 content, 0x02 = zlib-compressed UTF-8 content
+    byte 1     role: 0 = user, 1 = assistant, 2 = system
+    bytes 2..  content
+
+Entries written before the codec are JSON objects ('{' = 0x7b), and are still
+decoded, so existing histories keep working until LTRIM / TTL rotates them out.
+Roles outside the table are written as JSON too.
+"""
+import json
+import zlib
+from typing import Dict, Union
+from app.config import Config
+
+FORMAT_PLAIN = 0x01
+FORMAT_ZLIB = 0x02
+
+ROLES = ("user", "assistant", "system")
+ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+
+
+def encode_json(role: str, content: str) -> bytes:
+    return json.dumps({"role": role, "content": content}).encode("utf-8")
+
+def encode_message(
+    role: str,
+    content: str,
+    codec: str = Config.HISTORY_CODEC,
+    compress_min: int = Config.HISTORY_COMPRESS_MIN,
+) -> bytes:
+    """
+    Only messages of at least `compress_min` bytes are tried with zlib (short
+    chat lines get bigger), and the compressed form is kept only if it is smaller.
+    """
+    role_code = ROLE_CODES.get(role)
+    if codec == "json" or role_code is None:
+        return encode_json(role, content)
+
+    data = content.encode("utf-8")
+    if compress_min and len(data) >= compress_min:
+        packed = zlib.compress(data, Config.HISTORY_COMPRESS_LEVEL)
+        if len(packed) < len(data):
+            return bytes((FORMAT_ZLIB, role_code)) + packed
+    return bytes((FORMAT_PLAIN, role_code)) + data
+
+def decode_message(raw: Union[bytes, str]) -> Dict[str, str]:
+    if isinstance(raw, str):
+        # A client with decode_responses=True only ever sees legacy JSON entries
+        return json.loads(raw)
+    if not raw:
+        raise ValueError("Empty history entry")
+
+    fmt = raw[0]
+    if fmt == FORMAT_PLAIN:
+        return {"role": ROLES[raw[1]], "content": raw[2:].decode("utf-8")}
+    if fmt == FORMAT_ZLIB:
+        return {"role": ROLES[raw[1]], "content": zlib.decompress(raw[2:]).decode("utf-8")}
+    return json.loads(raw)
@@ -0,0 +1,209 @@
+# JamieBot/app/services/history_summary.py
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from redis.exceptions import WatchError
+from app.config import Config
+from app.services.redis_service import AsyncRedisService
+
+logger = logging.getLogger(__name__)
+
+# Marks the summary entry that SessionStore.load puts in front of the history
+SUMMARY_PREFIX = "[EARLIER IN THIS CONVERSATION]:\n"
+
+SUMMARY_PROMPT = (
+    "You keep running notes on a chat between Jamie (a dating coach's setter) and a lead.\n"
+    "Update the notes with the new messages.\n"
+    "Rules:\n"
+    "- Keep facts the lead shared (problem, situation, location, goals, money, objections) and what Jamie already asked.\n"
+    "- Drop small talk and repeated questions.\n"
+    "- Plain sentences, no lists, under 120 words.\n"
+    "Output the updated notes only."
+)
+
+# Reads retried when a turn lands in between (see HistorySummarizer._read_snapshot)
+SNAPSHOT_ATTEMPTS = 3
+
+# Per-message overhead of the chat format (role, separators), in tokens
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    ~4 characters per token for English chat text. Close enough for a budget,
+    and free compared to running a tokenizer on every turn.
+    """
+    return len(text) // 4 + 1
+
+def summary_message(summary: str) -> Dict[str, str]:
+    return {"role": "system", "content": f"{SUMMARY_PREFIX}{summary}"}
+
+def is_summary(message: Dict[str, str]) -> bool:
+    return message["role"] == "system" and message["content"].startswith(SUMMARY_PREFIX)
+
+def fit_history(
+    history: List[Dict[str, str]],
+    max_tokens: int = Config.HISTORY_TOKEN_BUDGET,
+    max_messages: int = Config.HISTORY_WINDOW,
+) -> List[Dict[str, str]]:
+    """
+    Context for one LLM call: the rolling summary (if the history starts with one)
+    plus as many of the most recent messages as fit in `max_tokens` (at most
+    `max_messages`). The latest message is always kept.
+    """
+    summary = [history[0]] if history and is_summary(history[0]) else []
+    messages = history[len(summary):]
+    kept = fitted_count(history, max_tokens, max_messages)
+    return summary + messages[len(messages) - kept:]
+
+def fitted_count(
+    history: List[Dict[str, str]],
+    max_tokens: int = Config.HISTORY_TOKEN_BUDGET,
+    max_messages: int = Config.HISTORY_WINDOW,
+) -> int:
+    """
+    How many of the most recent messages fit_history keeps. Everything older
+    has to be in the summary, see HistorySummarizer.schedule.
+    """
+    summary = [history[0]] if history and is_summary(history[0]) else []
+    messages = history[len(summary):]
+    if max_messages:
+        messages = messages[-max_messages:]
+
+    used = sum(estimate_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in summary)
+    kept = 0
+    for message in reversed(messages):
+        cost = estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+        if kept and used + cost > max_tokens:
+            break
+        used += cost
+        kept += 1
+    return kept
+
+class HistorySummarizer:
+    """
+    Folds messages that slid out of the recent window into a rolling summary
+    (jamie_summary:{user_id} -> summary, covered), next to jamie_chat:{user_id}.
+
+    HistoryLayout counts every message appended (the hash's `total` field), so
+    the list position of message #n is known even after LTRIM. `covered` is how
+    many messages the summary already includes.
+
+    schedule() is called after a turn commits and returns immediately; the
+    refresh runs as a background task, at most one per user (a Redis lock
+    also keeps other processes from summarizing the same user at the same time).
+    The turn passes how many recent messages still fit the prompt (fitted_count);
+    when long messages push that below `keep_recent`, the summary covers the
+    ones the token budget trimmed too.
+    """
+
+    def __init__(
+        self,
+        redis_service: AsyncRedisService,
+        llm_service,
+        keep_recent: int = Config.HISTORY_WINDOW,
+        min_batch: int = Config.SUMMARY_MIN_BATCH,
+    ):
+        self.redis_service = redis_service
+        self.client = redis_service.client
+        self.llm_service = llm_service
+        self.keep_recent = keep_recent
+        self.min_batch = min_batch
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # refreshed / skipped (not enough new messages) / busy (another process) / errors
+        self.stats: Dict[str, int] = {"refreshed": 0, "skipped": 0, "busy": 0, "errors": 0}
+
+    def _lock_key(self, user_id: str) -> str:
+        return f"jamie_summary_lock:{user_id}"
+
+    def schedule(self, user_id: str, keep_recent: Optional[int] = None) -> None:
+        if user_id in self._tasks:
+            return
+        task = asyncio.create_task(self.refresh(user_id, keep_recent))
+        self._tasks[user_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(user_id, None))
+
+    async def refresh(self, user_id: str, keep_recent: Optional[int] = None) -> bool:
+        """
+        Summarizes the messages older than the last `keep_recent` once at least
+        `min_batch` of them are pending. Returns True if the summary changed.
+        """
+        keep = self.keep_recent if keep_recent is None else min(keep_recent, self.keep_recent)
+        try:
+            return await self._refresh(user_id, keep)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Summary refresh for {user_id} failed: {e}")
+            return False
+
+    async def _refresh(self, user_id: str, keep_recent: int) -> bool:
+        summary_key = self.redis_service.summary_key(user_id)
+        total, covered = await self.client.hmget(summary_key, ["total", "covered"])
+        total, covered = int(total or 0), int(covered or 0)
+        if total - keep_recent - covered < self.min_batch:
+            self.stats["skipped"] += 1
+            return False
+
+        lock_key = self._lock_key(user_id)
+        if not await self.client.set(lock_key, "1", nx=True, ex=60):
+            self.stats["busy"] += 1
+            return False
+        try:
+            (summary, covered, total), raw_history = await self._read_snapshot(user_id)
+            covered, history = int(covered or 0), self.redis_service.decode_history(raw_history)
+            # Sessions from before the counter existed: the list is all there is
+            total = max(int(total or 0), len(history))
+
+            first = total - len(history)  # message number of history[0]
+            fold_until = total - keep_recent
+            pending = history[max(covered - first, 0):max(fold_until - first, 0)]
+            if not pending:
+                self.stats["skipped"] += 1
+                return False
+
+            summary = await self.summarize(summary or "", pending)
+            pipe = self.client.pipeline(transaction=True)
+            pipe.hset(summary_key, mapping={"summary": summary, "covered": fold_until})
+            pipe.expire(summary_key, self.redis_service.ttl)
+            await pipe.execute()
+            self.stats["refreshed"] += 1
+            return True
+        finally:
+            await self.client.delete(lock_key)
+
+    async def _read_snapshot(self, user_id: str) -> tuple:
+        """
+        The summary hash and the whole history list as of one moment: an append
+        landing between the two reads would shift `first` and fold the wrong
+        messages. Both keys are WATCHed and an empty MULTI/EXEC confirms neither
+        changed (history has to be read outside MULTI, EXEC replies ignore
+        NEVER_DECODE and the entries are binary).
+        """
+        summary_key = self.redis_service.summary_key(user_id)
+        history_key = self.redis_service.history_key(user_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            for _ in range(SNAPSHOT_ATTEMPTS):
+                try:
+                    await pipe.watch(summary_key, history_key)
+                    fields = await pipe.hmget(summary_key, ["summary", "covered", "total"])
+                    raw_history = await self.redis_service.read_history(pipe, user_id, 0, -1)
+                    pipe.multi()
+                    await pipe.execute()
+                    return fields, raw_history
+                except WatchError:
+                    continue
+        raise WatchError(f"History of {user_id} kept changing while reading it")
+
+    async def summarize(self, summary: str, messages: List[Dict[str, str]]) -> str:
+        transcript = "\n".join(
+            f"{'Jamie' if m['role'] == 'assistant' else 'Lead'}: {m['content']}" for m in messages
+        )
+        prompt = f"Current notes:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"
+        return await self.llm_service.summarize(SUMMARY_PROMPT, prompt, Config.SUMMARY_MAX_TOKENS)
+
+    async def drain(self) -> None:
+        """
+        Waits for in-flight refreshes (shutdown).
+        """
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
@@ -0,0 +1,202 @@
+# JamieBot/app/services/http_transport.py
+import logging
+import threading
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+import httpx
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upstream failures worth another attempt (APITimeoutError is an APIConnectionError)
+RETRYABLE_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised without calling OpenAI while the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops hammering a degraded upstream: after `failure_threshold` consecutive
+    failures the circuit opens and calls fail fast for `reset_timeout` seconds,
+    then a single trial call (half-open) decides whether to close it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = Config.OPENAI_BREAKER_FAILURES,
+        reset_timeout: float = Config.OPENAI_BREAKER_RESET,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half_open" and self._trial_in_flight):
+                raise CircuitOpenError("OpenAI circuit breaker is open")
+            if state == "half_open":
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """
+        The call ended without saying anything about upstream health (cancelled,
+        or rejected as a bad request): let the next call be the trial instead.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"OpenAI circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+
+
+def _http2_enabled() -> bool:
+    if not Config.OPENAI_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    except ImportError:
+        logger.warning("OPENAI_HTTP2 is set but the 'h2' package is missing, using HTTP/1.1")
+        return False
+    return True
+
+def _transport_options() -> dict:
+    return {
+        "http2": _http2_enabled(),
+        "limits": httpx.Limits(
+            max_connections=Config.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.OPENAI_MAX_KEEPALIVE,
+            keepalive_expiry=Config.OPENAI_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(
+            connect=Config.OPENAI_CONNECT_TIMEOUT,
+            read=Config.OPENAI_READ_TIMEOUT,
+            write=Config.OPENAI_READ_TIMEOUT,
+            pool=Config.OPENAI_CONNECT_TIMEOUT,
+        ),
+    }
+
+
+# --- SHARED CLIENTS (one pool per process, reused by every LLMService) ---
+breaker = CircuitBreaker()
+_sync_client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
+
+def get_openai_client() -> OpenAI:
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = OpenAI(
+            api_key=Config.OPENAI_API_KEY,
+            max_retries=0, # retries are handled by call_with_retry
+            http_client=httpx.Client(**_transport_options()),
+        )
+    return _sync_client
+
+def get_async_openai_client() -> AsyncOpenAI:
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(
+            api_key=Config.OPENAI_API_KEY,
+            max_retries=0,
+            http_client=httpx.AsyncClient(**_transport_options()),
+        )
+    return _async_client
+
+async def close_openai_clients() -> None:
+    global _sync_client, _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
+
+
+# --- RETRY + BREAKER ---
+def _retry_policy() -> dict:
+    return {
+        "stop": stop_after_attempt(Config.OPENAI_MAX_ATTEMPTS),
+        "wait": wait_random_exponential(multiplier=Config.OPENAI_BACKOFF_BASE, max=Config.OPENAI_BACKOFF_MAX),
+        "retry": retry_if_exception_type(RETRYABLE_ERRORS),
+        "reraise": True,
+    }
+
+def call_with_retry(fn: Callable[[], T]) -> T:
+    """
+    Runs one OpenAI request with jittered exponential backoff behind the breaker.
+    """
+    for attempt in Retrying(**_retry_policy()):
+        with attempt:
+            breaker.before_call()
+            try:
+                result = fn()
+            except RETRYABLE_ERRORS:
+                breaker.record_failure()
+                raise
+            except BaseException:
+                # Cancelled (discarded draft, SLO fallback) or a 4xx: upstream is fine,
+                # but a half-open trial must still be handed back
+                breaker.release_trial()
+                raise
+            breaker.record_success()
+            return result
+
+async def acall_with_retry(fn: Callable[[], Awaitable[T]]) -> T:
+    async for attempt in AsyncRetrying(**_retry_policy()):
+        with attempt:
+            breaker.before_call()
+            try:
+                result = await fn()
+            except RETRYABLE_ERRORS:
+                breaker.record_failure()
+                raise
+            except BaseException:
+                # Cancelled (discarded draft, SLO fallback) or a 4xx: upstream is fine,
+                # but a half-open trial must still be handed back
+                breaker.release_trial()
+                raise
+            breaker.record_success()
+            return result
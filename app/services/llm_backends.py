@@ -0,0 +1,259 @@
+# JamieBot/app/services/llm_backends.py
+import asyncio
+import json
+import logging
+import math
+import random
+import re
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from app.config import Config
+from app.services.http_transport import (
+    acall_with_retry,
+    call_with_retry,
+    close_openai_clients,
+    get_async_openai_client,
+    get_openai_client,
+)
+from app.services import metrics
+from app.services.prompt_registry import get_prompt_registry
+from app.state_machine.states import ConversationState
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackend(ABC):
+    """
+    Where LLMService sends chat completions. Selected by Config.LLM_BACKEND:
+    "openai" (default) or "fake" (local, deterministic, no network).
+    A backend missing one of the abstract methods fails when it is created.
+    """
+    name = "base"
+
+    @abstractmethod
+    def complete(self, model: str, messages: List[Dict], temperature: float, max_tokens: Optional[int] = None) -> str:
+        ...
+
+    @abstractmethod
+    def stream(self, model: str, messages: List[Dict], temperature: float, max_tokens: int) -> Iterator[str]:
+        ...
+
+    @abstractmethod
+    async def acomplete(self, model: str, messages: List[Dict], temperature: float, max_tokens: Optional[int] = None) -> str:
+        ...
+
+    @abstractmethod
+    async def astream(self, model: str, messages: List[Dict], temperature: float, max_tokens: int) -> AsyncIterator[str]:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class OpenAIBackend(LLMBackend):
+    """
+    OpenAI chat completions over the shared pooled clients, with retries + breaker.
+    """
+    name = "openai"
+
+    def __init__(self):
+        if not Config.OPENAI_API_KEY:
+            raise ValueError("OPENAI_API_KEY is not set")
+
+    def _params(self, model: str, messages: List[Dict], temperature: float, max_tokens: Optional[int]) -> dict:
+        params = {"model": model, "temperature": temperature, "messages": messages}
+        if max_tokens is not None:
+            params["max_completion_tokens"] = max_tokens
+        return params
+
+    def _usage(self, model: str, usage) -> None:
+        if usage is None:
+            return
+        logger.info(f"{model} usage: prompt={usage.prompt_tokens} completion={usage.completion_tokens}")
+        metrics.record_usage(model, usage.prompt_tokens, usage.completion_tokens)
+
+    def _text(self, model: str, response) -> str:
+        self._usage(model, response.usage)
+        return response.choices[0].message.content.strip()
+
+    def _delta(self, model: str, chunk) -> Optional[str]:
+        # With include_usage the last chunk has no choices, only the usage totals
+        if chunk.usage is not None:
+            self._usage(model, chunk.usage)
+        if chunk.choices and chunk.choices[0].delta.content:
+            return chunk.choices[0].delta.content
+        return None
+
+    def complete(self, model, messages, temperature, max_tokens=None) -> str:
+        client = get_openai_client()
+        params = self._params(model, messages, temperature, max_tokens)
+        return self._text(model, call_with_retry(lambda: client.chat.completions.create(**params)))
+
+    def stream(self, model, messages, temperature, max_tokens) -> Iterator[str]:
+        client = get_openai_client()
+        params = self._params(model, messages, temperature, max_tokens)
+        # Only opening the stream is retried; a stream that breaks mid-way is not replayed
+        stream = call_with_retry(lambda: client.chat.completions.create(
+            **params, stream=True, stream_options={"include_usage": True}
+        ))
+        for chunk in stream:
+            text = self._delta(model, chunk)
+            if text:
+                yield text
+
+    async def acomplete(self, model, messages, temperature, max_tokens=None) -> str:
+        client = get_async_openai_client()
+        params = self._params(model, messages, temperature, max_tokens)
+        return self._text(model, await acall_with_retry(lambda: client.chat.completions.create(**params)))
+
+    async def astream(self, model, messages, temperature, max_tokens) -> AsyncIterator[str]:
+        client = get_async_openai_client()
+        params = self._params(model, messages, temperature, max_tokens)
+        stream = await acall_with_retry(lambda: client.chat.completions.create(
+            **params, stream=True, stream_options={"include_usage": True}
+        ))
+        async for chunk in stream:
+            text = self._delta(model, chunk)
+            if text:
+                yield text
+
+    async def close(self) -> None:
+        await close_openai_clients()
+
+
+# The style pass sends the draft back as `Draft to rewrite: "<draft>"`
+DRAFT_PATTERN = re.compile(r'Draft to rewrite: "(.*)"\s*$', re.DOTALL)
+TOKEN_PATTERN = re.compile(r'\S+\s*')
+
+
+class FakeBackend(LLMBackend):
+    """
+    Local stand-in for benchmarks and offline runs. Never touches the network.
+
+    - Latency: time to first token drawn from FAKE_LLM_LATENCY ("fixed",
+      "uniform" or "lognormal") around FAKE_LLM_LATENCY_MS, then the reply is
+      produced at FAKE_LLM_TOKENS_PER_SEC. Seeded, so runs are repeatable.
+    - Replies ("canned" mode): the state prompt found in the messages picks the
+      state's reply from app/prompts/fallbacks.json, or from the JSON file at
+      FAKE_LLM_RESPONSES ({"STATE": "reply"}). "echo" mode repeats the user.
+    - The style pass returns its draft unchanged; classifier calls return
+      FAKE_LLM_EXTRACTION (default UNKNOWN, so the local rules decide).
+    """
+    name = "fake"
+
+    def __init__(
+        self,
+        mode: str = Config.FAKE_LLM_MODE,
+        latency: str = Config.FAKE_LLM_LATENCY,
+        latency_ms: float = Config.FAKE_LLM_LATENCY_MS,
+        jitter_ms: float = Config.FAKE_LLM_JITTER_MS,
+        tokens_per_sec: float = Config.FAKE_LLM_TOKENS_PER_SEC,
+        seed: Optional[int] = Config.FAKE_LLM_SEED,
+        responses_path: Optional[str] = Config.FAKE_LLM_RESPONSES,
+    ):
+        if latency not in {"fixed", "uniform", "lognormal"}:
+            raise ValueError(f"Unknown FAKE_LLM_LATENCY: {latency}")
+        self.mode = mode
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tokens_per_sec = tokens_per_sec
+        self._random = random.Random(seed)
+        self._canned = self._load_canned(responses_path)
+        self.calls = 0
+
+    def _load_canned(self, responses_path: Optional[str]) -> List[Tuple[str, str]]:
+        """
+        (state prompt, reply) pairs, longest prompt first so nested prompts can't shadow each other.
+        """
+        registry = get_prompt_registry()
+        overrides = json.loads(Path(responses_path).read_text(encoding="utf-8")) if responses_path else {}
+        canned = []
+        for state, prompt in registry.state_prompts().items():
+            reply = overrides.get(state.value) or registry.degraded_reply(state).reply
+            canned.append((prompt, reply))
+        return sorted(canned, key=lambda pair: -len(pair[0]))
+
+    # --- RESPONSES ---
+    def _reply(self, messages: List[Dict]) -> str:
+        self.calls += 1
+        last = messages[-1]["content"]
+
+        if messages[0]["content"].startswith("You are a data classifier"):
+            return Config.FAKE_LLM_EXTRACTION
+
+        draft = DRAFT_PATTERN.search(last)
+        if draft:
+            return draft.group(1)
+
+        if self.mode == "echo":
+            user_message = last.rsplit("\n", 1)[-1]
+            return f"you said: {user_message}"
+
+        for prompt, reply in self._canned:
+            if prompt in last:
+                return reply
+        return get_prompt_registry().degraded_reply(ConversationState.ENTRY).reply
+
+    def _tokens(self, model: str, messages: List[Dict], text: str, max_tokens: Optional[int]) -> List[str]:
+        tokens = TOKEN_PATTERN.findall(text)
+        tokens = tokens[:max_tokens] if max_tokens else tokens
+        # Word counts stand in for tokens, so token metrics still move in offline runs
+        prompt_tokens = sum(len(TOKEN_PATTERN.findall(m["content"])) for m in messages)
+        metrics.record_usage(model, prompt_tokens, len(tokens))
+        return tokens
+
+    # --- TIMING ---
+    def _first_token_delay(self) -> float:
+        if self.latency == "fixed":
+            ms = self.latency_ms
+        elif self.latency == "uniform":
+            ms = self._random.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+        else:
+            # Median = latency_ms, jitter_ms sets the spread of the long tail
+            sigma = math.log1p(self.jitter_ms / self.latency_ms) if self.latency_ms > 0 else 0.0
+            ms = self._random.lognormvariate(math.log(max(self.latency_ms, 1e-3)), sigma)
+        return max(ms, 0.0) / 1000
+
+    def _token_delay(self) -> float:
+        return 1 / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+
+    # --- SYNC ---
+    def complete(self, model, messages, temperature, max_tokens=None) -> str:
+        tokens = self._tokens(model, messages, self._reply(messages), max_tokens)
+        time.sleep(self._first_token_delay() + self._token_delay() * len(tokens))
+        return "".join(tokens).strip()
+
+    def stream(self, model, messages, temperature, max_tokens) -> Iterator[str]:
+        tokens = self._tokens(model, messages, self._reply(messages), max_tokens)
+        time.sleep(self._first_token_delay())
+        for token in tokens:
+            yield token
+            time.sleep(self._token_delay())
+
+    # --- ASYNC ---
+    async def acomplete(self, model, messages, temperature, max_tokens=None) -> str:
+        tokens = self._tokens(model, messages, self._reply(messages), max_tokens)
+        await asyncio.sleep(self._first_token_delay() + self._token_delay() * len(tokens))
+        return "".join(tokens).strip()
+
+    async def astream(self, model, messages, temperature, max_tokens) -> AsyncIterator[str]:
+        tokens = self._tokens(model, messages, self._reply(messages), max_tokens)
+        await asyncio.sleep(self._first_token_delay())
+        for token in tokens:
+            yield token
+            await asyncio.sleep(self._token_delay())
+
+
+BACKENDS = {
+    OpenAIBackend.name: OpenAIBackend,
+    FakeBackend.name: FakeBackend,
+}
+
+def create_backend(name: str = Config.LLM_BACKEND) -> LLMBackend:
+    backend = BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown LLM_BACKEND '{name}' (expected one of {sorted(BACKENDS)})")
+    return backend()
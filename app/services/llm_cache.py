@@ -0,0 +1,121 @@
+# JamieBot/app/services/llm_cache.py
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Optional
+from app.config import Config
+from app.state_machine.exit_rules import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache for deterministic (temperature 0) completions.
+
+    Tier 1: in-process LRU with TTL.
+    Tier 2 (optional): Redis, shared by all workers (jamie_llm_cache:{hash}).
+    Keys are a hash of (model, system prompt, normalized input), so "USA!" and
+    "usa" share an entry. Redis failures are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = Config.LLM_CACHE_SIZE,
+        ttl: int = Config.LLM_CACHE_TTL,
+        redis_client=None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.redis_client = redis_client
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # local_hits / redis_hits / misses / evictions
+        self.stats = Counter()
+
+    def key(self, model: str, system_prompt: str, text: str) -> str:
+        digest = hashlib.sha256(
+            "\x1f".join((model, system_prompt, normalize_text(text))).encode("utf-8")
+        ).hexdigest()
+        return f"jamie_llm_cache:{digest}"
+
+    # --- TIER 1 (in-process LRU) ---
+    def get_local(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set_local(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    # --- SYNC API (redis.Redis client) ---
+    def get(self, key: str) -> Optional[str]:
+        value = self.get_local(key)
+        if value is not None:
+            self.stats["local_hits"] += 1
+            return value
+
+        if self.redis_client is not None:
+            try:
+                value = self.redis_client.get(key)
+            except Exception as e:
+                logger.error(f"LLM cache read failed: {e}")
+                value = None
+            if value is not None:
+                self.stats["redis_hits"] += 1
+                self.set_local(key, value)
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        self.set_local(key, value)
+        if self.redis_client is not None:
+            try:
+                self.redis_client.set(key, value, ex=self.ttl)
+            except Exception as e:
+                logger.error(f"LLM cache write failed: {e}")
+
+    # --- ASYNC API (redis.asyncio client) ---
+    async def aget(self, key: str) -> Optional[str]:
+        value = self.get_local(key)
+        if value is not None:
+            self.stats["local_hits"] += 1
+            return value
+
+        if self.redis_client is not None:
+            try:
+                value = await self.redis_client.get(key)
+            except Exception as e:
+                logger.error(f"LLM cache read failed: {e}")
+                value = None
+            if value is not None:
+                self.stats["redis_hits"] += 1
+                self.set_local(key, value)
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def aset(self, key: str, value: str) -> None:
+        self.set_local(key, value)
+        if self.redis_client is not None:
+            try:
+                await self.redis_client.set(key, value, ex=self.ttl)
+            except Exception as e:
+                logger.error(f"LLM cache write failed: {e}")
@@ -0,0 +1,251 @@
+# JamieBot/app/services/metrics.py
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+# Seconds; covers a sub-millisecond guardrail up to a slow two-pass generation
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Mapping[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        ...
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in values
+        ]
+
+
+class Histogram(Metric):
+    """
+    Fixed buckets; observe() is one bisect + a few additions under a lock.
+    """
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = [(key, list(values)) for key, values in self._series.items()]
+        lines = self.header()
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {_number(cumulative)}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(values[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {_number(cumulative)}")
+        return lines
+
+
+class CallbackMetric(Metric):
+    """
+    Read at scrape time from an existing stats Counter (e.g. LLMService.extraction_stats),
+    so hot paths that already count don't pay twice.
+    """
+
+    def __init__(self, name: str, documentation: str, labelname: str, read: Callable[[], Mapping[str, float]], kind: str = "counter"):
+        super().__init__(name, documentation, (labelname,))
+        self.kind = kind
+        self.read = read
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, (label,))} {_number(value)}"
+            for label, value in sorted(self.read().items())
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        # Re-registering a name replaces it (callbacks bound to a new service instance)
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # scraped every few seconds; keep it out of the logs
+
+
+def serve_metrics(host: str, port: int) -> ThreadingHTTPServer:
+    """
+    Exposes this process's REGISTRY on its own port from a daemon thread
+    (one per prefork worker, see app/server.py).
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name=f"metrics-{port}", daemon=True).start()
+    return server
+
+# --- HOT-PATH METRICS ---
+TURN_STEP_SECONDS = REGISTRY.register(Histogram(
+    "jamie_turn_step_seconds",
+    "Time spent in each step of a turn (guardrails, extraction, transition, generation, session I/O...)",
+    ["step"],
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "jamie_request_seconds",
+    "End-to-end handling time per API endpoint",
+    ["endpoint"],
+))
+LLM_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "jamie_llm_request_seconds",
+    "Latency of each LLM call (streams: until the last token)",
+    ["model", "kind"],
+))
+LLM_REQUESTS = REGISTRY.register(Counter(
+    "jamie_llm_requests_total",
+    "LLM calls by model and outcome",
+    ["model", "outcome"],
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "jamie_llm_tokens_total",
+    "Tokens reported by the LLM backend per model",
+    ["model", "type"],
+))
+STATE_TRANSITIONS = REGISTRY.register(Counter(
+    "jamie_state_transitions_total",
+    "Funnel transitions decided by the state machine",
+    ["from_state", "to_state"],
+))
+
+
+def span(step: str):
+    """
+    with metrics.span("extraction"): ...
+    """
+    return TURN_STEP_SECONDS.time(step=step)
+
+@contextmanager
+def llm_call(model: str, kind: str) -> Iterator[None]:
+    """
+    Times one LLM call and counts its outcome (ok / error / cancelled).
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    except (asyncio.CancelledError, GeneratorExit):
+        # Abandoned by the caller (SLO fallback, client disconnect), not an upstream failure
+        outcome = "cancelled"
+        raise
+    finally:
+        LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, model=model, kind=kind)
+        LLM_REQUESTS.inc(model=model, outcome=outcome)
+
+def record_usage(model: str, prompt_tokens: int, completion_tokens: int) -> None:
+    LLM_TOKENS.inc(prompt_tokens, model=model, type="prompt")
+    LLM_TOKENS.inc(completion_tokens, model=model, type="completion")
@@ -0,0 +1,180 @@
+# JamieBot/app/services/prompt_registry.py
+import json
+import logging
+import threading
+from collections import Counter
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional
+from app.config import Config
+from app.state_machine.states import ConversationState
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
+
+# Fallback for new stages if file missing
+FALLBACK_PROMPT = "You are Jamie. Keep the conversation moving."
+
+# Per-state latency SLO + scripted reply for degraded mode
+DEGRADED_FILE = "fallbacks.json"
+DEFAULT_DEGRADED_REPLY = "Got it. Tell me a bit more about that?"
+
+
+class DegradedReply(NamedTuple):
+    slo: float
+    reply: str
+
+
+class PromptRegistry:
+    """
+    Preloads every prompt file under app/prompts/ into an immutable in-memory map,
+    along with the degraded-mode metadata in fallbacks.json (per-state SLO and
+    scripted reply). The request path only does dict lookups; with hot reload enabled a daemon
+    thread polls file mtimes and swaps in a fresh snapshot when anything changes.
+    """
+
+    def __init__(
+        self,
+        prompts_dir: Path = PROMPTS_DIR,
+        hot_reload: bool = Config.PROMPT_HOT_RELOAD,
+        reload_interval: float = Config.PROMPT_RELOAD_INTERVAL,
+    ):
+        self.prompts_dir = Path(prompts_dir)
+        self.reload_interval = reload_interval
+        self.hot_reload = hot_reload
+        self._fallbacks = Counter()
+        self._stop = threading.Event()
+        self._files: Mapping[str, str] = MappingProxyType({})
+        self._by_state: Mapping[ConversationState, str] = MappingProxyType({})
+        self._degraded: Mapping[str, DegradedReply] = MappingProxyType({})
+        self._mtimes: Dict[str, float] = {}
+        self.reloads = 0
+        self.reload()
+
+        self._watcher: Optional[threading.Thread] = None
+        self.start()
+
+    def _scan_mtimes(self) -> Dict[str, float]:
+        paths = list(self.prompts_dir.glob("*.txt")) + list(self.prompts_dir.glob(DEGRADED_FILE))
+        return {path.name: path.stat().st_mtime for path in paths}
+
+    def _load_degraded(self) -> Dict[str, DegradedReply]:
+        """
+        fallbacks.json: {"default": {"slo": 6.0, "reply": "..."}, "<STATE>": {...}}.
+        States without an entry (or missing fields) inherit from "default".
+        """
+        path = self.prompts_dir / DEGRADED_FILE
+        raw = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+        base = raw.get("default", {})
+        default = DegradedReply(
+            slo=float(base.get("slo", Config.RESPONSE_SLO_DEFAULT)),
+            reply=base.get("reply", DEFAULT_DEGRADED_REPLY),
+        )
+        degraded = {"default": default}
+        for state in ConversationState:
+            entry = raw.get(state.value, {})
+            degraded[state.value] = DegradedReply(
+                slo=float(entry.get("slo", default.slo)),
+                reply=entry.get("reply", default.reply),
+            )
+        return degraded
+
+    def reload(self) -> None:
+        """
+        Reads all prompt files and atomically replaces the current snapshot.
+        """
+        mtimes = self._scan_mtimes()
+        files = {
+            name: (self.prompts_dir / name).read_text(encoding="utf-8").strip()
+            for name in sorted(mtimes) if name.endswith(".txt")
+        }
+        degraded = self._load_degraded()
+        by_state = {
+            state: files[f"{state.value.lower()}.txt"]
+            for state in ConversationState
+            if f"{state.value.lower()}.txt" in files
+        }
+
+        # Readers only ever see a complete snapshot (attribute assignment is atomic)
+        self._files = MappingProxyType(files)
+        self._by_state = MappingProxyType(by_state)
+        self._degraded = MappingProxyType(degraded)
+        self._mtimes = mtimes
+        self.reloads += 1
+
+        missing = [state.value for state in ConversationState if state not in by_state]
+        logger.info(f"Loaded {len(files)} prompts from {self.prompts_dir} (states without prompt: {missing})")
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.reload_interval):
+            try:
+                if self._scan_mtimes() != self._mtimes:
+                    self.reload()
+            except (OSError, ValueError) as e:
+                logger.error(f"Prompt reload failed: {e}")
+
+    def start(self) -> None:
+        """
+        Starts the hot-reload watcher unless it is already running. Threads don't
+        survive fork(), so prefork workers call this again after forking.
+        """
+        if not self.hot_reload or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="prompt-registry-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _fallback(self, name: str) -> str:
+        if self._fallbacks[name] == 0:
+            logger.warning(f"Prompt '{name}' not found, serving fallback prompt")
+        self._fallbacks[name] += 1
+        return FALLBACK_PROMPT
+
+    # --- PUBLIC API ---
+    def get(self, filename: str) -> str:
+        prompt = self._files.get(filename)
+        if prompt is None:
+            return self._fallback(filename)
+        return prompt
+
+    def for_state(self, state: ConversationState) -> str:
+        prompt = self._by_state.get(state)
+        if prompt is None:
+            return self._fallback(f"{state.value.lower()}.txt")
+        return prompt
+
+    def state_prompts(self) -> Mapping[ConversationState, str]:
+        # Current snapshot of states that have their own prompt file
+        return self._by_state
+
+    def degraded_reply(self, state: ConversationState) -> DegradedReply:
+        return self._degraded.get(state.value) or self._degraded["default"]
+
+    @property
+    def fallbacks_served(self) -> int:
+        return sum(self._fallbacks.values())
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "prompts_loaded": len(self._files),
+            "reloads": self.reloads,
+            "fallbacks_served": self.fallbacks_served,
+            "fallbacks_by_prompt": dict(self._fallbacks),
+        }
+
+
+_registry: Optional[PromptRegistry] = None
+
+def get_prompt_registry() -> PromptRegistry:
+    """
+    Process-wide registry, created on first use.
+    """
+    global _registry
+    if _registry is None:
+        _registry = PromptRegistry()
+    return _registry
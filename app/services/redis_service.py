@@ -1,10 +1,72 @@
 # JamieBot/app/services/redis_service.py
 import redis
-import json
-from typing import List, Dict
+import redis.asyncio as aioredis
+from redis.client import NEVER_DECODE
+from typing import List, Dict, Union
 from app.config import Config
+from app.services import history_codec
 
-class RedisService:
+class HistoryLayout:
+    """
+    Key naming and (de)serialization of the chat history list,
+    shared by the sync/async services and the session store.
+    """
+    ttl: int = Config.SESSION_TTL
+    max_messages: int = Config.HISTORY_MAX_MESSAGES
+
+    def history_key(self, user_id: str) -> str:
+        return f"jamie_chat:{user_id}"
+
+    def summary_key(self, user_id: str) -> str:
+        # Rolling summary + message counters (see HistorySummarizer)
+        return f"jamie_summary:{user_id}"
+
+    def encode_message(self, role: str, content: str) -> bytes:
+        # HISTORY_CODEC: legacy JSON (default for now) or compact binary, see app/services/history_codec.py
+        return history_codec.encode_message(role, content)
+
+    def decode_history(self, raw_history: List[Union[bytes, str]]) -> List[Dict[str, str]]:
+        return [history_codec.decode_message(msg) for msg in raw_history]
+
+    def read_history(self, target, user_id: str, start: int = 0, end: int = -1):
+        """
+        LRANGE on a client or pipeline, returned as raw bytes even though the
+        clients decode responses (history entries are binary).
+        """
+        return target.execute_command("LRANGE", self.history_key(user_id), start, end, **{NEVER_DECODE: []})
+
+    def queue_turn(self, pipe, user_id: str, user_message: str, reply: str):
+        """
+        Queues one full turn on a pipeline: push both messages,
+        trim to the history cap, refresh the TTL.
+        """
+        key = self.history_key(user_id)
+        pipe.rpush(
+            key,
+            self.encode_message("user", user_message),
+            self.encode_message("assistant", reply),
+        )
+        pipe.ltrim(key, -self.max_messages, -1)
+        pipe.expire(key, self.ttl)
+        self._queue_count(pipe, user_id, 2)
+
+    def _queue_count(self, pipe, user_id: str, added: int):
+        # Messages ever appended, so positions survive LTRIM
+        pipe.hincrby(self.summary_key(user_id), "total", added)
+        pipe.expire(self.summary_key(user_id), self.ttl)
+
+    def queue_message(self, pipe, user_id: str, role: str, content: str):
+        """
+        Same as queue_turn for a single message (e.g. a follow-up nobody asked for).
+        """
+        key = self.history_key(user_id)
+        pipe.rpush(key, self.encode_message(role, content))
+        pipe.ltrim(key, -self.max_messages, -1)
+        pipe.expire(key, self.ttl)
+        self._queue_count(pipe, user_id, 1)
+
+
+class RedisService(HistoryLayout):
     def __init__(self):
         self.client = redis.Redis(
             host=Config.REDIS_HOST,
@@ -14,32 +76,94 @@ class RedisService:
             decode_responses=True # Returns strings instead of bytes
         )
         self.ttl = Config.SESSION_TTL
+        self.max_messages = Config.HISTORY_MAX_MESSAGES
 
     def get_history(self, user_id: str) -> List[Dict[str, str]]:
         """
         Retrieves full chat history for a user.
         """
-        key = f"jamie_chat:{user_id}"
         # Get all items in the list (0 to -1)
-        raw_history = self.client.lrange(key, 0, -1)
-        return [json.loads(msg) for msg in raw_history]
+        raw_history = self.read_history(self.client, user_id, 0, -1)
+        return self.decode_history(raw_history)
+
+    def get_recent_history(self, user_id: str, limit: int = Config.HISTORY_WINDOW) -> List[Dict[str, str]]:
+        """
+        Retrieves only the last `limit` messages (what the LLM actually sees).
+        """
+        raw_history = self.read_history(self.client, user_id, -limit, -1)
+        return self.decode_history(raw_history)
+
+    def append_turn(self, user_id: str, user_message: str, reply: str):
+        """
+        Saves one full turn (user message + bot reply) in a single MULTI round-trip.
+        """
+        pipe = self.client.pipeline(transaction=True)
+        self.queue_turn(pipe, user_id, user_message, reply)
+        pipe.execute()
 
     def add_message(self, user_id: str, role: str, content: str):
         """
         Appends a message to the history.
         """
-        key = f"jamie_chat:{user_id}"
-        message = {"role": role, "content": content}
-        
-        # Push to right end of list
-        self.client.rpush(key, json.dumps(message))
-        
-        # Reset Expiry (keep session alive)
-        self.client.expire(key, self.ttl)
+        # Push to right end of list + reset expiry (keep session alive)
+        pipe = self.client.pipeline(transaction=True)
+        self.queue_message(pipe, user_id, role, content)
+        pipe.execute()
 
     def clear_history(self, user_id: str):
         """
         Clears history (useful when resetting flow).
         """
-        key = f"jamie_chat:{user_id}"
-        self.client.delete(key)
\ No newline at end of file
+        self.client.delete(self.history_key(user_id), self.summary_key(user_id))
+
+
+class AsyncRedisService(HistoryLayout):
+    """
+    redis.asyncio version of RedisService.
+    All instances share one bounded connection pool per process.
+    """
+    _pool: aioredis.ConnectionPool | None = None
+
+    def __init__(self):
+        if AsyncRedisService._pool is None:
+            AsyncRedisService._pool = aioredis.ConnectionPool(
+                host=Config.REDIS_HOST,
+                port=Config.REDIS_PORT,
+                db=Config.REDIS_DB,
+                password=Config.REDIS_PASSWORD,
+                max_connections=Config.REDIS_MAX_CONNECTIONS,
+                decode_responses=True
+            )
+        self.client = aioredis.Redis(connection_pool=AsyncRedisService._pool)
+        self.ttl = Config.SESSION_TTL
+        self.max_messages = Config.HISTORY_MAX_MESSAGES
+
+    async def get_history(self, user_id: str) -> List[Dict[str, str]]:
+        raw_history = await self.read_history(self.client, user_id, 0, -1)
+        return self.decode_history(raw_history)
+
+    async def get_recent_history(self, user_id: str, limit: int = Config.HISTORY_WINDOW) -> List[Dict[str, str]]:
+        raw_history = await self.read_history(self.client, user_id, -limit, -1)
+        return self.decode_history(raw_history)
+
+    async def append_turn(self, user_id: str, user_message: str, reply: str):
+        pipe = self.client.pipeline(transaction=True)
+        self.queue_turn(pipe, user_id, user_message, reply)
+        await pipe.execute()
+
+    async def add_message(self, user_id: str, role: str, content: str):
+        pipe = self.client.pipeline(transaction=True)
+        self.queue_message(pipe, user_id, role, content)
+        await pipe.execute()
+
+    async def clear_history(self, user_id: str):
+        await self.client.delete(self.history_key(user_id), self.summary_key(user_id))
+
+    async def close(self):
+        """
+        Releases the shared pool (call once on shutdown).
+        """
+        await self.client.aclose()
+        if AsyncRedisService._pool is not None:
+            await AsyncRedisService._pool.disconnect()
+            AsyncRedisService._pool = None
@@ -0,0 +1,160 @@
+# JamieBot/app/services/session_store.py
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from redis.exceptions import WatchError
+from app.config import Config
+from app.services.followups import FollowUpScheduler
+from app.services.history_summary import summary_message
+from app.services.redis_service import AsyncRedisService
+from app.state_machine.states import ConversationState
+
+
+class SessionConflictError(Exception):
+    """
+    Raised when the session changed between load and commit (concurrent turn).
+    """
+
+
+@dataclass
+class Session:
+    """
+    Server-side conversation state for one user.
+    """
+    state: ConversationState = ConversationState.ENTRY
+    turn_count: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    version: int = 0
+
+    def orchestrator_attributes(self) -> Dict[str, Any]:
+        # The orchestrator keeps the turn counter inside the attributes dict
+        return {**self.attributes, "current_state_turn_count": self.turn_count}
+
+    def apply_result(self, result: Dict[str, Any]) -> None:
+        """
+        Copies the outcome of Orchestrator.process_message into the session.
+        """
+        self.state = ConversationState(result["next_state"])
+        attributes = result.get("extracted_attributes")
+        if attributes is not None:
+            attributes = dict(attributes)
+            self.turn_count = attributes.pop("current_state_turn_count", 0)
+            self.attributes = attributes
+
+
+class SessionStore:
+    """
+    Keeps state, turn count and extracted attributes in one Redis hash per user
+    (jamie_session:{user_id}), next to the chat history list.
+    Commits are optimistic: WATCH + version check, so two concurrent turns for
+    the same user cannot both win.
+    With a FollowUpScheduler, each commit also resets the user's follow-up clock.
+    """
+
+    def __init__(self, redis_service: AsyncRedisService, followups: Optional[FollowUpScheduler] = None):
+        self.redis_service = redis_service
+        self.client = redis_service.client
+        self.ttl = Config.SESSION_TTL
+        self.followups = followups
+
+    def _key(self, user_id: str) -> str:
+        return f"jamie_session:{user_id}"
+
+    def _decode(self, raw: Dict[str, str]) -> Session:
+        if not raw:
+            return Session()
+        return Session(
+            state=ConversationState(raw.get("state", ConversationState.ENTRY.value)),
+            turn_count=int(raw.get("turn_count", 0)),
+            attributes=json.loads(raw.get("attributes", "{}")),
+            version=int(raw.get("version", 0)),
+        )
+
+    def _queue_load(self, pipe, user_id: str, history_limit: int) -> None:
+        pipe.hgetall(self._key(user_id))
+        self.redis_service.read_history(pipe, user_id, -history_limit, -1)
+        pipe.hget(self.redis_service.summary_key(user_id), "summary")
+
+    def _decode_history(self, raw_history: List[bytes], summary: Optional[str]) -> List[Dict[str, str]]:
+        # The rolling summary (if any) leads the history as one system message
+        history = self.redis_service.decode_history(raw_history)
+        return [summary_message(summary), *history] if summary else history
+
+    async def load(self, user_id: str, history_limit: int = Config.HISTORY_WINDOW) -> Tuple[Session, List[Dict[str, str]]]:
+        """
+        Session hash + rolling summary + recent history in one round-trip.
+        """
+        pipe = self.client.pipeline(transaction=False)
+        self._queue_load(pipe, user_id, history_limit)
+        raw_session, raw_history, summary = await pipe.execute()
+        return self._decode(raw_session), self._decode_history(raw_history, summary)
+
+    async def load_many(
+        self, user_ids: List[str], history_limit: int = Config.HISTORY_WINDOW
+    ) -> Dict[str, Tuple[Session, List[Dict[str, str]]]]:
+        """
+        load() for several users in one pipelined round-trip.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        pipe = self.client.pipeline(transaction=False)
+        for user_id in user_ids:
+            self._queue_load(pipe, user_id, history_limit)
+        raw = await pipe.execute()
+        return {
+            user_id: (self._decode(raw[3 * i]), self._decode_history(raw[3 * i + 1], raw[3 * i + 2]))
+            for i, user_id in enumerate(user_ids)
+        }
+
+    async def version(self, user_id: str) -> int:
+        """
+        Committed version only: a cheap check that a preloaded session is still current.
+        """
+        return int(await self.client.hget(self._key(user_id), "version") or 0)
+
+    async def commit(
+        self,
+        user_id: str,
+        session: Session,
+        user_message: str,
+        reply: str,
+        fence: Optional[int] = None,
+    ) -> None:
+        """
+        Atomically writes the session (bumping its version) and appends the turn
+        to the history. Raises SessionConflictError if another turn committed first,
+        or if `fence` (TurnLock token) is older than the last committed one.
+        """
+        key = self._key(user_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                stored_version, stored_fence = await pipe.hmget(key, ["version", "fence"])
+                if int(stored_version or 0) != session.version:
+                    raise SessionConflictError(f"Session for {user_id} changed during the turn")
+                if fence is not None and int(stored_fence or 0) > fence:
+                    raise SessionConflictError(f"Stale turn lock for {user_id}")
+
+                fields = {
+                    "state": session.state.value,
+                    "turn_count": session.turn_count,
+                    "attributes": json.dumps(session.attributes),
+                    "version": session.version + 1,
+                }
+                if fence is not None:
+                    fields["fence"] = fence
+
+                pipe.multi()
+                pipe.hset(key, mapping=fields)
+                pipe.expire(key, self.ttl)
+                self.redis_service.queue_turn(pipe, user_id, user_message, reply)
+                if self.followups is not None:
+                    self.followups.queue_activity(pipe, user_id, session.state)
+                await pipe.execute()
+            except WatchError:
+                raise SessionConflictError(f"Session for {user_id} changed during the turn")
+        session.version += 1
+
+    async def clear(self, user_id: str) -> None:
+        await self.client.delete(self._key(user_id))
+        if self.followups is not None:
+            await self.followups.cancel(user_id)
@@ -0,0 +1,106 @@
+# JamieBot/app/services/turn_lock.py
+import asyncio
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+from app.config import Config
+from app.services.redis_service import AsyncRedisService
+
+# Take the lease and hand out the next fencing token in one step.
+# The fence counter outlives the session hash so tokens never restart under a live session.
+ACQUIRE_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    local fence = redis.call('INCR', KEYS[2])
+    redis.call('PEXPIRE', KEYS[2], ARGV[3])
+    return fence
+end
+return 0
+"""
+
+# Only the holder may release (the lease may have expired and been re-taken)
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class TurnLockTimeout(Exception):
+    """
+    Raised when another turn for the same user held the lock for too long.
+    """
+
+
+class TurnLock:
+    """
+    Serializes turns per user so a double-send is processed one after the other
+    instead of twice against the same history.
+
+    Two layers:
+    - an in-process asyncio.Lock per user (fast path, no Redis polling for
+      requests that land on the same worker);
+    - a Redis lease (jamie_lock:{user_id}, SET NX PX) across workers, which
+      returns a monotonically increasing fencing token. SessionStore.commit
+      rejects writes carrying an older token than the last one committed.
+    """
+
+    def __init__(
+        self,
+        redis_service: AsyncRedisService,
+        lease_ms: int = Config.TURN_LOCK_LEASE_MS,
+        wait_timeout: float = Config.TURN_LOCK_WAIT_TIMEOUT,
+    ):
+        self.client = redis_service.client
+        self.lease_ms = lease_ms
+        self.fence_ttl_ms = (Config.SESSION_TTL + 3600) * 1000
+        self.wait_timeout = wait_timeout
+        self._acquire = self.client.register_script(ACQUIRE_SCRIPT)
+        self._release = self.client.register_script(RELEASE_SCRIPT)
+        self._local: Dict[str, asyncio.Lock] = {}
+        self._holders: Dict[str, int] = {}
+
+    def _keys(self, user_id: str) -> list[str]:
+        return [f"jamie_lock:{user_id}", f"jamie_lock_fence:{user_id}"]
+
+    async def _acquire_lease(self, user_id: str, lease_id: str, deadline: float) -> int:
+        delay = 0.02
+        while True:
+            fence = await self._acquire(keys=self._keys(user_id), args=[lease_id, self.lease_ms, self.fence_ttl_ms])
+            if fence:
+                return int(fence)
+            if time.monotonic() >= deadline:
+                raise TurnLockTimeout(f"Another message for {user_id} is still being processed")
+            # Jittered backoff so waiting workers don't poll in lockstep
+            await asyncio.sleep(delay * (0.5 + random.random()))
+            delay = min(delay * 2, 0.25)
+
+    @asynccontextmanager
+    async def hold(self, user_id: str) -> AsyncIterator[int]:
+        """
+        async with turn_lock.hold(user_id) as fence: ...
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        local = self._local.setdefault(user_id, asyncio.Lock())
+        self._holders[user_id] = self._holders.get(user_id, 0) + 1
+        try:
+            try:
+                await asyncio.wait_for(local.acquire(), timeout=self.wait_timeout)
+            except asyncio.TimeoutError:
+                raise TurnLockTimeout(f"Another message for {user_id} is still being processed")
+            try:
+                lease_id = uuid.uuid4().hex
+                fence = await self._acquire_lease(user_id, lease_id, deadline)
+                try:
+                    yield fence
+                finally:
+                    await self._release(keys=self._keys(user_id)[:1], args=[lease_id])
+            finally:
+                local.release()
+        finally:
+            self._holders[user_id] -= 1
+            if not self._holders[user_id]:
+                del self._holders[user_id]
+                del self._local[user_id]
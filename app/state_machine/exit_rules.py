@@ -1,37 +1,63 @@
 # JamieBot/app/state_machine/exit_rules.py
 import re
 import unicodedata
+from dataclasses import dataclass
+from typing import FrozenSet, Union
+from app.routing.keyword_matcher import ABUSIVE, DATING, scan_keywords
 
 # 1. TEXT NORMALIZATION (Still needed for the Orchestrator)
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s']")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
 def normalize_text(text: str) -> str:
     if not text:
         return ""
-    text = unicodedata.normalize("NFKD", text)
+    # NFKD never changes pure ASCII, which is almost every message
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
     text = text.lower()
-    text = re.sub(r"[^\w\s']", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
+    text = PUNCTUATION_PATTERN.sub(" ", text)
+    text = WHITESPACE_PATTERN.sub(" ", text).strip()
     return text
 
-# 2. ABUSE DETECTION (Still needed for the ENTRY state)
-ABUSIVE_KEYWORDS = {
-    "fuck", "fucking", "fuck off",
-    "bitch", "slut", "whore",
-    "asshole", "dumbass",
-    "retard", "nigger", "rape",
-    "kill", "die", "kys", "go die",
-}
+@dataclass(frozen=True)
+class NormalizedMessage:
+    """
+    One user message, normalized once per turn and handed to the guardrails,
+    transitions and problem inference instead of each re-normalizing the raw text.
+    """
+    raw: str
+    normalized: str
+    # Keyword categories (app/routing/keyword_matcher.py) found in `normalized`
+    categories: FrozenSet[str]
 
-def is_abusive(text: str) -> bool:
-    return any(word in text for word in ABUSIVE_KEYWORDS)
+    @classmethod
+    def from_text(cls, text: str) -> "NormalizedMessage":
+        normalized = normalize_text(text)
+        return cls(
+            raw=text or "",
+            normalized=normalized,
+            categories=scan_keywords(normalized),
+        )
 
-def entry_boundary_action(normalized_text: str, extracted_attributes: dict) -> str:
+    @classmethod
+    def of(cls, message: Union[str, "NormalizedMessage"]) -> "NormalizedMessage":
+        # Plain strings are still accepted by the helpers below
+        return message if isinstance(message, cls) else cls.from_text(message)
+
+# 2. ABUSE DETECTION (Still needed for the ENTRY state)
+# ABUSIVE_KEYWORDS: see app/routing/keywords.py (stems like "*fuck*"; "die" and "kill" stay whole words)
+def is_abusive(message: Union[str, NormalizedMessage]) -> bool:
+    return ABUSIVE in NormalizedMessage.of(message).categories
+
+def entry_boundary_action(message: Union[str, NormalizedMessage], extracted_attributes: dict) -> str:
     """
     Checks if the very first message is abusive.
     Returns: "ALLOW", "WARN_ABUSE", or "HARD_STOP"
     """
     abuse_count = extracted_attributes.get("abuse_count", 0)
     
-    if is_abusive(normalized_text):
+    if is_abusive(message):
         abuse_count += 1
         extracted_attributes["abuse_count"] = abuse_count
         
@@ -44,28 +70,24 @@ def entry_boundary_action(normalized_text: str, extracted_attributes: dict) -> s
 
 # 3. ENTRY SKIPPING LOGIC (Still needed for ENTRY state)
 # If the user says "Hi, I need help with dating", we skip "How is your day?"
-DATING_KEYWORDS = {
-    "date", "dating", "love life", "girlfriend", "boyfriend",
-    "single", "matches", "tinder", "hinge", "bumble", "ghosted",
-    "relationship", "hookups", "talking stage", "help", "advice"
-}
+# DATING_KEYWORDS: see app/routing/keywords.py
 
 ORIENTATION_PHRASES = {
     "hi", "hello", "hey", "hey there",
     "who are you", "what is this", "are you real", "are you a bot"
 }
 
-def is_orientation_only(text: str) -> bool:
-    return text.strip() in ORIENTATION_PHRASES
+def is_orientation_only(message: Union[str, NormalizedMessage]) -> bool:
+    return NormalizedMessage.of(message).normalized in ORIENTATION_PHRASES
 
-def has_dating_context(text: str) -> bool:
-    return any(word in text for word in DATING_KEYWORDS)
+def has_dating_context(message: Union[str, NormalizedMessage]) -> bool:
+    return DATING in NormalizedMessage.of(message).categories
 
-def should_exit_entry(text: str) -> bool:
+def should_exit_entry(message: Union[str, NormalizedMessage]) -> bool:
     """
     Determines if the user skipped small talk and went straight to business.
     """
-    normalized = normalize_text(text)
-    if is_orientation_only(normalized):
+    message = NormalizedMessage.of(message)
+    if is_orientation_only(message):
         return False
-    return has_dating_context(normalized)
\ No newline at end of file
+    return has_dating_context(message)
\ No newline at end of file
@@ -0,0 +1,222 @@
+# JamieBot/app/state_machine/transition_table.py
+import json
+import logging
+from collections import deque
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from app.config import Config
+from app.state_machine.states import ConversationState
+from app.state_machine.exit_rules import (
+    NormalizedMessage, entry_boundary_action, should_exit_entry
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TABLE_PATH = Path(__file__).resolve().parent / "transition_table.json"
+
+# States the funnel never leaves
+TERMINAL_STATES = {ConversationState.END}
+
+
+class TransitionContext:
+    """
+    What a guard can look at for one turn. Derived values are computed at most
+    once, so guards sharing them (e.g. both abuse checks) don't repeat side effects.
+    """
+
+    def __init__(self, message: NormalizedMessage, attributes: Dict[str, Any]):
+        self.message = message
+        self.attributes = attributes
+        self.turns = attributes.get("current_state_turn_count", 0)
+
+    @cached_property
+    def boundary_action(self) -> str:
+        # Bumps abuse_count, so it must only run once per turn
+        return entry_boundary_action(self.message, self.attributes)
+
+
+Guard = Callable[[TransitionContext], bool]
+
+# Named guards usable as {"when": "<name>"} in the table
+GUARDS: Dict[str, Guard] = {
+    "abuse_hard_stop": lambda ctx: ctx.boundary_action == "HARD_STOP",
+    "abuse_warning": lambda ctx: ctx.boundary_action == "WARN_ABUSE",
+    # User skipped small talk and went straight to dating ("I need help with a girl")
+    "dating_context": lambda ctx: should_exit_entry(ctx.message),
+    # Extraction failed but they clearly answered something; assume innocent until proven broke
+    "answered": lambda ctx: len(ctx.message.raw) > 5,
+}
+
+RULE_KEYS = {"to", "when", "min_turns", "attribute", "in"}
+
+
+class Rule(NamedTuple):
+    target: ConversationState
+    guards: Tuple[Guard, ...]
+    label: str
+
+
+class TransitionTable:
+    """
+    Declarative funnel: state -> ordered rules, each with a target state and
+    optional conditions (named guard, turn limit, attribute predicate).
+    The JSON spec is compiled once into a dict of guard tuples, so picking the
+    next state is one lookup plus the few rules of the current state.
+    """
+
+    def __init__(self, spec: Dict[str, List[Dict[str, Any]]]):
+        self.spec = {name: rules for name, rules in spec.items() if not name.startswith("_")}
+        self._rules: Dict[ConversationState, Tuple[Rule, ...]] = {
+            self._state(name): tuple(self._compile_rule(name, rule) for rule in rules)
+            for name, rules in self.spec.items()
+        }
+        self.warnings = self.validate()
+
+    @classmethod
+    def load(cls, path: Union[str, Path, None] = None) -> "TransitionTable":
+        path = Path(path or Config.TRANSITION_TABLE_PATH or DEFAULT_TABLE_PATH)
+        table = cls(json.loads(path.read_text(encoding="utf-8")))
+        logger.info(f"Loaded transition table from {path} ({len(table._rules)} states)")
+        return table
+
+    # --- COMPILATION ---
+    def _state(self, name: str) -> ConversationState:
+        if name not in ConversationState.__members__:
+            raise ValueError(f"Transition table: unknown state '{name}'")
+        return ConversationState[name]
+
+    def _compile_rule(self, state_name: str, rule: Dict[str, Any]) -> Rule:
+        unknown = set(rule) - RULE_KEYS
+        if unknown or "to" not in rule:
+            raise ValueError(f"Transition table: bad rule in {state_name}: {rule}")
+
+        guards: List[Guard] = []
+        labels: List[str] = []
+
+        if "when" in rule:
+            guard = GUARDS.get(rule["when"])
+            if guard is None:
+                raise ValueError(f"Transition table: unknown guard '{rule['when']}' in {state_name}")
+            guards.append(guard)
+            labels.append(rule["when"])
+
+        if "min_turns" in rule:
+            min_turns = int(rule["min_turns"])
+            guards.append(lambda ctx, n=min_turns: ctx.turns >= n)
+            labels.append(f"turns>={min_turns}")
+
+        if ("attribute" in rule) != ("in" in rule):
+            raise ValueError(f"Transition table: 'attribute' and 'in' go together in {state_name}: {rule}")
+        if "attribute" in rule:
+            attribute, values = rule["attribute"], frozenset(rule["in"])
+            if not values:
+                raise ValueError(f"Transition table: empty 'in' for {attribute} in {state_name}")
+            guards.append(lambda ctx, a=attribute, v=values: ctx.attributes.get(a) in v)
+            labels.append(f"{attribute} in {sorted(values)}")
+
+        return Rule(self._state(rule["to"]), tuple(guards), " and ".join(labels))
+
+    # --- VALIDATION ---
+    def validate(self) -> List[str]:
+        """
+        Hard errors (ValueError): a non-terminal state without rules, or whose last
+        rule is conditional (a turn could match nothing).
+        Warnings (logged + returned): states unreachable from ENTRY, and dead
+        states that can never be left.
+        """
+        for state in ConversationState:
+            if state in TERMINAL_STATES:
+                continue
+            rules = self._rules.get(state)
+            if not rules:
+                raise ValueError(f"Transition table: no transitions for {state.value}")
+            if rules[-1].guards:
+                raise ValueError(f"Transition table: last rule of {state.value} must be unconditional")
+
+        warnings = []
+        reachable = self.reachable_from(ConversationState.ENTRY)
+        unreachable = [state.value for state in ConversationState if state not in reachable]
+        if unreachable:
+            warnings.append(f"unreachable from ENTRY: {unreachable}")
+
+        dead = [
+            state.value for state, rules in self._rules.items()
+            if state not in TERMINAL_STATES and all(rule.target == state for rule in rules)
+        ]
+        if dead:
+            warnings.append(f"dead states (no way out): {dead}")
+
+        for warning in warnings:
+            logger.warning(f"Transition table: {warning}")
+        return warnings
+
+    def reachable_from(self, start: ConversationState) -> set:
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for rule in self._rules.get(queue.popleft(), ()):
+                if rule.target not in seen:
+                    seen.add(rule.target)
+                    queue.append(rule.target)
+        return seen
+
+    # --- RUNTIME ---
+    def next_state(
+        self,
+        current_state: ConversationState,
+        message: Union[str, NormalizedMessage],
+        extracted_attributes: Dict[str, Any],
+    ) -> ConversationState:
+        rules = self._rules.get(current_state)
+        if not rules:
+            # Terminal states stay where they are
+            return current_state
+
+        ctx = TransitionContext(NormalizedMessage.of(message), extracted_attributes)
+        for rule in rules:
+            if all(guard(ctx) for guard in rule.guards):
+                return rule.target
+        return current_state
+
+    # --- EXPORT ---
+    def edges(self) -> List[Tuple[str, str, str]]:
+        return [
+            (state.value, rule.target.value, rule.label or "otherwise")
+            for state, rules in self._rules.items()
+            for rule in rules
+        ]
+
+    def graph(self) -> Dict[str, Any]:
+        return {
+            "states": [state.value for state in ConversationState],
+            "terminal": sorted(state.value for state in TERMINAL_STATES),
+            "edges": [{"from": src, "to": dst, "when": label} for src, dst, label in self.edges()],
+            "warnings": self.warnings,
+        }
+
+    def to_dot(self) -> str:
+        lines = ["digraph funnel {", "  rankdir=LR;"]
+        for state in TERMINAL_STATES:
+            lines.append(f'  "{state.value}" [shape=doublecircle];')
+        for src, dst, label in self.edges():
+            lines.append(f'  "{src}" -> "{dst}" [label="{label}"];')
+        lines.append("}")
+        return "\n".join(lines)
+
+
+_table: Optional[TransitionTable] = None
+
+def get_transition_table() -> TransitionTable:
+    """
+    Process-wide table, compiled and validated on first use.
+    """
+    global _table
+    if _table is None:
+        _table = TransitionTable.load()
+    return _table
+
+
+if __name__ == "__main__":
+    # python -m app.state_machine.transition_table > funnel.dot
+    print(get_transition_table().to_dot())
@@ -1,12 +1,24 @@
 # JamieBot/app/validators/length_check.py
 import re
+from typing import List
+
+# A sentence ends at ! or ? (any run), or at a lone "." - followed by whitespace or the end.
+# "..." (the persona's pause) and dots inside tokens ("jamiedatecoaching.com") don't end one.
+SENTENCE_END = re.compile(r'(?:[!?][.!?]*|(?<!\.)\.(?!\.))(?=\s|$)')
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Sentences of a reply, punctuation kept, empty pieces dropped.
+    """
+    sentences, start = [], 0
+    for match in SENTENCE_END.finditer(text):
+        sentences.append(text[start:match.end()])
+        start = match.end()
+    sentences.append(text[start:])
+    return [s.strip() for s in sentences if s.strip(" .!?…")]
 
 def validate_length(text: str) -> bool:
     """
     Validates that the text contains no more than 2 sentences.
     """
-    # Split sentences by punctuation
-    sentences = re.split(r'[.!?]+', text)
-    # Remove empty strings
-    sentences = [s.strip() for s in sentences if s.strip()]
-    return len(sentences) <= 2
+    return len(split_sentences(text)) <= 2
@@ -0,0 +1,45 @@
+# JamieBot/app/validators/reply_check.py
+from typing import List, Optional
+from app.validators.length_check import split_sentences, validate_length
+from app.validators.question_check import validate_question_count
+
+MAX_SENTENCES = 2
+
+# A repair that throws away more than this share of the reply is not worth shipping
+MIN_KEEP_RATIO = 0.4
+
+REPLY_VALIDATORS = [
+    ("length", validate_length),
+    ("questions", validate_question_count),
+]
+
+def check_reply(text: str) -> List[str]:
+    """
+    Runs every reply validator; returns the names of the ones that failed.
+    """
+    return [name for name, validator in REPLY_VALIDATORS if not validator(text)]
+
+def repair_reply(text: str) -> Optional[str]:
+    """
+    Cheap local fix for a reply that breaks the "max 2 sentences, max 1 question" rule:
+    keeps the first question (later ones tend to be fragments: "...in the US? or europe?"),
+    at most one statement before it, and ends there.
+    Returns None if the result would be empty or lose most of the reply.
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return None
+
+    first_question = next((i for i, s in enumerate(sentences) if s.endswith("?")), None)
+    if first_question is not None:
+        statements = [s for s in sentences[:first_question] if not s.endswith("?")]
+        kept = statements[:MAX_SENTENCES - 1] + [sentences[first_question]]
+    else:
+        kept = sentences[:MAX_SENTENCES]
+
+    repaired = " ".join(kept).strip()
+    if not repaired or len(repaired) < len(text.strip()) * MIN_KEEP_RATIO:
+        return None
+    if check_reply(repaired):
+        return None
+    return repaired
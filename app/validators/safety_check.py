@@ -1,23 +1,12 @@
 # JamieBot/app/validators/safety_check.py
-UNSAFE_KEYWORDS = {
-    "nude",
-    "nudes",
-    "sex",
-    "onlyfans",
-    "explicit",
-    "porn",
-    "hookup",
-}
+from typing import Union
+from app.routing.keyword_matcher import UNSAFE
+from app.state_machine.exit_rules import NormalizedMessage
 
 
-def validate_safety(text: str) -> bool:
+def validate_safety(text: Union[str, NormalizedMessage]) -> bool:
     """
-    Checks for unsafe or disallowed language.
+    Checks for unsafe or disallowed language (UNSAFE_KEYWORDS in app/routing/keywords.py).
     """
-    
-    lowered = text.lower()
-    for keyword in UNSAFE_KEYWORDS:
-        if keyword in lowered:
-            return False
-    
-    return True
+
+    return UNSAFE not in NormalizedMessage.of(text).categories
@@ -0,0 +1,49 @@
+# JamieBot/app/warmup.py
+import logging
+import time
+from typing import Dict
+from app.routing.keyword_matcher import KEYWORD_MATCHER
+from app.routing.product_catalog import PRODUCTS
+from app.services.prompt_registry import get_prompt_registry
+from app.state_machine.exit_rules import NormalizedMessage
+from app.state_machine.transition_table import get_transition_table
+from app.validators.safety_check import validate_safety
+
+logger = logging.getLogger(__name__)
+
+# Run once through the text pipeline so lazy imports and regex/keyword paths are hot
+WARMUP_MESSAGES = (
+    "hi",
+    "I keep getting ghosted after the first date",
+    "Café con leche and déjà vu 😂",
+    "I'm in the USA",
+)
+
+_stats: Dict[str, float] = {}
+
+def warm() -> Dict[str, float]:
+    """
+    Loads every read-only structure the request path uses: prompt registry,
+    transition table, keyword automaton, product catalog. Idempotent.
+    The prefork server calls it before forking, so workers share these pages
+    copy-on-write instead of each building its own.
+    """
+    if _stats:
+        return _stats
+
+    started = time.perf_counter()
+    registry = get_prompt_registry()
+    table = get_transition_table()
+    for text in WARMUP_MESSAGES:
+        NormalizedMessage.from_text(text)
+        validate_safety(text)
+
+    _stats.update(
+        prompts=registry.stats()["prompts_loaded"],
+        transitions=len(table.edges()),
+        keyword_states=len(KEYWORD_MATCHER),
+        products=len(PRODUCTS),
+        warmup_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+    logger.info(f"Warm: {_stats}")
+    return _stats
@@ -0,0 +1,89 @@
+# JamieBot/benchmarks/bench_history.py
+"""
+Stored chat history: legacy JSON entries vs the binary codec
+(app/services/history_codec.py). Sizes are exact encoded bytes for a
+realistic conversation; with a redis-server, MEMORY USAGE of the whole list
+is reported too (fakeredis can't measure it).
+"""
+import asyncio
+import json
+import uuid
+from itertools import cycle
+from typing import Any, Dict, List, Optional
+from benchmarks.common import FUNNEL_SCRIPT, SAMPLE_MESSAGES, bench
+from benchmarks.bench_redis import make_redis_service
+from app.config import Config
+from app.services import history_codec
+from app.services.prompt_registry import get_prompt_registry
+
+CODECS = ["json", "binary"]
+
+
+def conversation() -> List[Dict[str, str]]:
+    """
+    HISTORY_MAX_MESSAGES messages: funnel answers + scripted Jamie replies,
+    with a few long rants mixed in (the messages zlib is for).
+    """
+    registry = get_prompt_registry()
+    replies = [registry.degraded_reply(state).reply for state in registry.state_prompts()]
+    rant = " ".join(SAMPLE_MESSAGES[2:7])
+    users = FUNNEL_SCRIPT + [rant] + SAMPLE_MESSAGES[:4] + [rant] + SAMPLE_MESSAGES[4:]
+    messages = []
+    for user, reply in zip(cycle(users), cycle(replies)):
+        messages += [{"role": "user", "content": user}, {"role": "assistant", "content": reply}]
+        if len(messages) >= Config.HISTORY_MAX_MESSAGES:
+            break
+    return messages[:Config.HISTORY_MAX_MESSAGES]
+
+
+def _encode(codec: str, message: Dict[str, str]) -> bytes:
+    return history_codec.encode_message(message["role"], message["content"], codec=codec)
+
+
+async def _redis_memory(entries: Dict[str, List[bytes]]) -> Optional[Dict[str, int]]:
+    service = make_redis_service(use_fakeredis=False)
+    try:
+        usage = {}
+        for codec, encoded in entries.items():
+            key = f"bench-history-{uuid.uuid4().hex}"
+            await service.client.rpush(key, *encoded)
+            usage[codec] = await service.client.memory_usage(key)
+            await service.client.delete(key)
+        return usage
+    except Exception:
+        return None
+    finally:
+        await service.close()
+
+
+def run(iterations: int = 20000, use_fakeredis: bool = False) -> Dict[str, Any]:
+    messages = conversation()
+    window = messages[-Config.HISTORY_WINDOW:]
+    entries = {codec: [_encode(codec, m) for m in messages] for codec in CODECS}
+    windows = {codec: [_encode(codec, m) for m in window] for codec in CODECS}
+    payload = sum(len(m["content"].encode("utf-8")) for m in messages)
+
+    results: Dict[str, Any] = {
+        "messages": len(messages),
+        "content_bytes": payload,
+        "bytes": {codec: sum(map(len, encoded)) for codec, encoded in entries.items()},
+        "compressed_entries": sum(e[0] == history_codec.FORMAT_ZLIB for e in entries["binary"]),
+    }
+    results["bytes_saved_pct"] = round(100 * (1 - results["bytes"]["binary"] / results["bytes"]["json"]), 1)
+    if not use_fakeredis:
+        results["redis_memory_usage"] = asyncio.run(_redis_memory(entries))
+
+    source = cycle(messages)
+    for codec in CODECS:
+        encoded_window = windows[codec]
+        results[f"encode_{codec}"] = bench(lambda: _encode(codec, next(source)), iterations)
+        # What every turn pays: decoding the HISTORY_WINDOW messages it loads
+        results[f"decode_window_{codec}"] = bench(
+            lambda: [history_codec.decode_message(raw) for raw in encoded_window], iterations // 10
+        )
+    # The same entries as before the codec (str from a decoding client)
+    legacy_window = [json.dumps(m) for m in window]
+    results["decode_window_legacy_str"] = bench(
+        lambda: [history_codec.decode_message(raw) for raw in legacy_window], iterations // 10
+    )
+    return results
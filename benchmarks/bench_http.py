@@ -0,0 +1,65 @@
+# JamieBot/benchmarks/bench_http.py
+"""
+Load test of POST /process-message through the ASGI app in-process (no socket),
+at increasing concurrency. Each virtual user walks the funnel script with its
+own user_id, so the turn lock never makes users wait on each other.
+"""
+import asyncio
+import time
+import uuid
+from typing import Any, Dict, List, Sequence
+import httpx
+from benchmarks.common import FUNNEL_SCRIPT, summarize
+
+
+def _wire_fakeredis() -> None:
+    import fakeredis
+    from app.api import routes
+    fake = fakeredis.FakeAsyncRedis(decode_responses=True)
+    routes.redis_service.client = fake
+    routes.session_store.client = fake
+    routes.turn_lock = routes.TurnLock(routes.redis_service)
+    for service in (routes.followups, routes.summarizer):
+        if service is not None:
+            service.client = fake
+
+
+async def _level(client: httpx.AsyncClient, concurrency: int, turns: int) -> Dict[str, Any]:
+    samples: List[float] = []
+    errors: Dict[str, int] = {}
+
+    async def virtual_user():
+        user_id = f"bench-{uuid.uuid4().hex}"
+        for turn in range(turns):
+            message = FUNNEL_SCRIPT[turn % len(FUNNEL_SCRIPT)]
+            t = time.perf_counter()
+            response = await client.post("/process-message", json={"user_id": user_id, "message": message})
+            samples.append(time.perf_counter() - t)
+            if response.status_code != 200:
+                errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+        await client.delete(f"/clear-history/{user_id}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user() for _ in range(concurrency)))
+    result = summarize(samples, time.perf_counter() - started, len(samples))
+    result["errors"] = errors
+    return result
+
+
+async def _run(levels: Sequence[int], turns: int, use_fakeredis: bool) -> Dict[str, Any]:
+    from app.api import routes
+    from app.main import app
+
+    if use_fakeredis:
+        _wire_fakeredis()
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            return {f"concurrency_{level}": await _level(client, level, turns) for level in levels}
+    finally:
+        await routes.redis_service.close()
+
+
+def run(levels: Sequence[int] = (1, 8, 32, 128), turns: int = 10, use_fakeredis: bool = False) -> Dict[str, Any]:
+    return asyncio.run(_run(levels, turns, use_fakeredis))
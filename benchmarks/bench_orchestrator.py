@@ -0,0 +1,75 @@
+# JamieBot/benchmarks/bench_orchestrator.py
+"""
+Full Orchestrator.process_message with the fake LLM backend (zero latency by
+default), i.e. the service's own per-turn overhead: guardrails, extraction
+rules, transitions, prompt lookup, message building, validation.
+"""
+from itertools import cycle
+from typing import Any, Dict
+from benchmarks.common import FUNNEL_SCRIPT, abench, bench
+from app.orchestrator import AsyncOrchestrator, Orchestrator
+from app.state_machine.states import ConversationState
+
+
+class _Conversation:
+    """
+    Walks the funnel script turn by turn, restarting at ENTRY when it runs out or ends.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.state = ConversationState.ENTRY
+        self.attributes: Dict[str, Any] = {}
+        self.history = []
+        self.script = iter(FUNNEL_SCRIPT)
+
+    def next_message(self) -> str:
+        message = next(self.script, None)
+        if message is None or self.state == ConversationState.END:
+            self.reset()
+            message = next(self.script)
+        return message
+
+    def apply(self, message: str, result: Dict[str, Any]) -> None:
+        self.state = ConversationState(result["next_state"])
+        self.attributes = result.get("extracted_attributes") or {}
+        self.history = (self.history + [
+            {"role": "user", "content": message},
+            {"role": "assistant", "content": result["reply"]},
+        ])[-10:]
+
+
+def run(iterations: int = 2000) -> Dict[str, Any]:
+    sync_orchestrator = Orchestrator()
+    sync_conversation = _Conversation()
+
+    def sync_turn():
+        message = sync_conversation.next_message()
+        result = sync_orchestrator.process_message(
+            message, sync_conversation.state, sync_conversation.attributes, sync_conversation.history
+        )
+        sync_conversation.apply(message, result)
+
+    async_orchestrator = AsyncOrchestrator()
+    async_conversation = _Conversation()
+
+    async def async_turn():
+        message = async_conversation.next_message()
+        result = await async_orchestrator.process_message(
+            message, async_conversation.state, async_conversation.attributes, async_conversation.history
+        )
+        async_conversation.apply(message, result)
+
+    guardrail_messages = cycle(["are you a bot?", "why do you ask", "send nudes"])
+
+    def guardrail_turn():
+        sync_orchestrator.process_message(next(guardrail_messages), ConversationState.STAGE_2_TIME_COST, {}, [])
+
+    return {
+        "process_message_sync": bench(sync_turn, iterations),
+        "process_message_async": abench(async_turn, iterations),
+        "guardrail_short_circuit": bench(guardrail_turn, iterations),
+        "generation_stats": dict(sync_orchestrator.llm_service.generation_stats),
+    }
@@ -0,0 +1,62 @@
+# JamieBot/benchmarks/bench_redis.py
+"""
+Redis history + session round-trips. Uses the redis-server from Config unless
+use_fakeredis is set (pip install fakeredis lupa); fakeredis numbers exclude
+network time and are only useful for comparing client-side work.
+"""
+import asyncio
+import time
+import uuid
+from typing import Any, Dict
+from benchmarks.common import summarize
+from app.services.redis_service import AsyncRedisService
+from app.services.session_store import SessionStore
+
+
+def make_redis_service(use_fakeredis: bool) -> AsyncRedisService:
+    service = AsyncRedisService()
+    if use_fakeredis:
+        import fakeredis
+        service.client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    return service
+
+
+async def _run(iterations: int, use_fakeredis: bool) -> Dict[str, Any]:
+    service = make_redis_service(use_fakeredis)
+    store = SessionStore(service)
+    user_id = f"bench-{uuid.uuid4().hex}"
+
+    async def measure(step):
+        samples = []
+        started = time.perf_counter()
+        for i in range(iterations):
+            t = time.perf_counter()
+            await step(i)
+            samples.append(time.perf_counter() - t)
+        return summarize(samples, time.perf_counter() - started, iterations)
+
+    async def append_turn(i):
+        await service.append_turn(user_id, f"user message {i}", f"assistant reply {i}")
+
+    async def recent_history(i):
+        await service.get_recent_history(user_id)
+
+    async def session_round_trip(i):
+        session, _ = await store.load(user_id)
+        await store.commit(user_id, session, f"user message {i}", f"assistant reply {i}")
+
+    try:
+        return {
+            "append_turn": await measure(append_turn),
+            "get_recent_history": await measure(recent_history),
+            "session_load_commit": await measure(session_round_trip),
+        }
+    finally:
+        await service.clear_history(user_id)
+        await store.clear(user_id)
+        # The pool is per event loop; later suites run on a new one
+        await service.close()
+
+
+def run(iterations: int = 2000, use_fakeredis: bool = False) -> Dict[str, Any]:
+    return asyncio.run(_run(iterations, use_fakeredis))
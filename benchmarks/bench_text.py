@@ -0,0 +1,36 @@
+# JamieBot/benchmarks/bench_text.py
+"""
+Per-turn text pipeline, one hot path at a time (no I/O).
+"""
+from itertools import cycle
+from typing import Any, Dict
+from benchmarks.common import SAMPLE_MESSAGES, bench
+from app.routing.problem_inference import infer_problem_tag
+from app.state_machine.exit_rules import NormalizedMessage, normalize_text
+from app.state_machine.states import ConversationState
+from app.state_machine.transitions import determine_next_state
+from app.validators.safety_check import validate_safety
+
+
+def run(iterations: int = 20000) -> Dict[str, Any]:
+    raw = cycle(SAMPLE_MESSAGES)
+    normalized = cycle([normalize_text(m) for m in SAMPLE_MESSAGES])
+    messages = cycle([NormalizedMessage.from_text(m) for m in SAMPLE_MESSAGES])
+    states = cycle([
+        ConversationState.ENTRY,
+        ConversationState.STAGE_1_PATTERN,
+        ConversationState.STAGE_10_QUAL_LOCATION,
+        ConversationState.STAGE_10_QUAL_FINANCE,
+    ])
+
+    return {
+        "normalize_text": bench(lambda: normalize_text(next(raw)), iterations),
+        "normalized_message": bench(lambda: NormalizedMessage.from_text(next(raw)), iterations),
+        # String inputs hit the keyword-scan LRU after the first pass over the samples
+        "infer_problem_tag": bench(lambda: infer_problem_tag(next(normalized)), iterations),
+        "validate_safety": bench(lambda: validate_safety(next(raw)), iterations),
+        "determine_next_state": bench(
+            lambda: determine_next_state(next(states), next(messages), {"current_state_turn_count": 1}),
+            iterations,
+        ),
+    }
@@ -0,0 +1,110 @@
+# JamieBot/benchmarks/common.py
+import asyncio
+import os
+import platform
+import statistics
+import subprocess
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+# Benchmarks never call OpenAI: the fake backend answers instantly unless told otherwise
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY", "fixed")
+os.environ.setdefault("FAKE_LLM_LATENCY_MS", "0")
+os.environ.setdefault("FAKE_LLM_TOKENS_PER_SEC", "0")
+
+
+def summarize(samples: List[float], elapsed: float, operations: int) -> Dict[str, Any]:
+    """
+    samples are per-operation latencies in seconds; reported in microseconds.
+    """
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1e6, 2)
+
+    return {
+        "operations": operations,
+        "ops_per_sec": round(operations / elapsed, 1) if elapsed else None,
+        "mean_us": round(statistics.fmean(ordered) * 1e6, 2),
+        "p50_us": pct(0.50),
+        "p95_us": pct(0.95),
+        "p99_us": pct(0.99),
+        "max_us": round(ordered[-1] * 1e6, 2),
+    }
+
+
+def bench(fn: Callable[[], Any], iterations: int, warmup: int = 100) -> Dict[str, Any]:
+    for _ in range(min(warmup, iterations)):
+        fn()
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+    return summarize(samples, time.perf_counter() - started, iterations)
+
+
+def abench(fn: Callable[[], Awaitable[Any]], iterations: int, warmup: int = 20) -> Dict[str, Any]:
+    async def run():
+        for _ in range(min(warmup, iterations)):
+            await fn()
+        samples = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            t = time.perf_counter()
+            await fn()
+            samples.append(time.perf_counter() - t)
+        return summarize(samples, time.perf_counter() - started, iterations)
+    return asyncio.run(run())
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "llm_backend": os.environ.get("LLM_BACKEND"),
+    }
+
+
+# Messages covering the funnel's common shapes (greeting, problem, abuse, unicode)
+SAMPLE_MESSAGES = [
+    "hi",
+    "Hey there! How's it going?",
+    "I need help with a girl, she stopped texting me back after the first date",
+    "honestly I get matches on tinder but they never turn into dates",
+    "I freeze up when I try to approach women at the gym",
+    "we were talking and then the spark just died, no idea why",
+    "Café con leche and déjà vu, that's my whole dating life 😂",
+    "fuck off",
+    "I'm in the USA, living paycheck to paycheck lol",
+    "ok",
+]
+
+# A plausible run through the funnel, one message per turn
+FUNNEL_SCRIPT = [
+    "hi",
+    "good thanks, you?",
+    "I keep getting ghosted after texting for a bit",
+    "usually over text",
+    "yeah always",
+    "about two years now",
+    "also I get nervous on dates",
+    "tried watching youtube videos",
+    "a real relationship",
+    "my confidence I guess",
+    "yeah I do",
+    "no never",
+    "sounds good",
+    "I live in the US",
+    "29",
+]
@@ -0,0 +1,63 @@
+# JamieBot/benchmarks/run.py
+"""
+Runs the benchmark suites and writes one JSON document.
+
+    python -m benchmarks.run                         # all suites, needs redis-server
+    python -m benchmarks.run --fakeredis -o out.json # no Redis needed (pip install fakeredis lupa)
+    python -m benchmarks.run --suite text --suite orchestrator
+
+The LLM is the fake backend (LLM_BACKEND=fake, zero latency unless the
+FAKE_LLM_* variables say otherwise), so numbers measure this service only.
+"""
+import argparse
+import json
+import sys
+import time
+from benchmarks.common import environment
+
+SUITES = ["text", "redis", "history", "orchestrator", "http"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JamieBot benchmarks")
+    parser.add_argument("--suite", action="append", choices=SUITES, help="suite to run (repeatable, default: all)")
+    parser.add_argument("--iterations", type=int, default=None, help="override per-suite iteration count")
+    parser.add_argument("--levels", default="1,8,32,128", help="HTTP concurrency levels")
+    parser.add_argument("--turns", type=int, default=10, help="HTTP turns per virtual user")
+    parser.add_argument("--fakeredis", action="store_true", help="use fakeredis instead of redis-server")
+    parser.add_argument("-o", "--output", default="-", help="JSON output file ('-' for stdout)")
+    args = parser.parse_args()
+
+    # Imported after common.py has set the fake LLM backend defaults
+    from benchmarks import bench_history, bench_http, bench_orchestrator, bench_redis, bench_text
+
+    iterations = {} if args.iterations is None else {"iterations": args.iterations}
+    runners = {
+        "text": lambda: bench_text.run(**iterations),
+        "redis": lambda: bench_redis.run(use_fakeredis=args.fakeredis, **iterations),
+        "history": lambda: bench_history.run(use_fakeredis=args.fakeredis, **iterations),
+        "orchestrator": lambda: bench_orchestrator.run(**iterations),
+        "http": lambda: bench_http.run(
+            levels=[int(level) for level in args.levels.split(",")],
+            turns=args.turns,
+            use_fakeredis=args.fakeredis,
+        ),
+    }
+
+    report = {"environment": environment(), "started_at": time.time(), "results": {}}
+    for suite in args.suite or SUITES:
+        print(f"running {suite}...", file=sys.stderr)
+        started = time.perf_counter()
+        report["results"][suite] = runners[suite]()
+        report["results"][suite]["duration_sec"] = round(time.perf_counter() - started, 2)
+
+    output = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(output)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
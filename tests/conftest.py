@@ -0,0 +1,15 @@
+# JamieBot/tests/conftest.py
+import pytest
+from app.services.redis_service import AsyncRedisService
+
+
+@pytest.fixture
+def redis_service():
+    """
+    AsyncRedisService on a private in-memory fakeredis server (Lua scripts need lupa).
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    service = AsyncRedisService()
+    service.client = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    return service
@@ -0,0 +1,34 @@
+# JamieBot/tests/test_attribute_rules.py
+import pytest
+from app.routing.attribute_rules import classify_attribute
+
+# (answer, attribute type, expected label); None means the answer goes to the LLM
+RULE_CASES = [
+    ("I live in New Mexico", "location", "US"),
+    ("new york city", "location", "US"),
+    ("Atlanta", "location", "US"),
+    ("US", "location", "US"),
+    ("im in the US", "location", "US"),
+    ("USA", "location", "US"),
+    ("us", "location", None),
+    ("just us two", "location", None),
+    ("mexico city", "location", "OTHER"),
+    ("toronto", "location", "CANADA"),
+    ("london uk", "location", "EU"),
+    ("north america", "location", None),
+    ("Central America", "location", None),
+    ("I live in New England", "location", None),
+    ("Georgia", "location", None),
+    ("good question", "finance", None),
+    ("fine I guess", "finance", None),
+    ("not much", "finance", "LOW"),
+    ("not doing well", "finance", None),
+    ("not much to complain about, doing well", "finance", None),
+    ("paycheck to paycheck", "finance", "LOW"),
+    ("doing well, I have savings", "finance", "HIGH"),
+    ("usa", "unknown_attribute", None),
+]
+
+@pytest.mark.parametrize("text, attribute_type, expected", RULE_CASES)
+def test_classify_attribute(text, attribute_type, expected):
+    assert classify_attribute(text, attribute_type) == expected
@@ -0,0 +1,84 @@
+# JamieBot/tests/test_circuit_breaker.py
+import asyncio
+import time
+import httpx
+import pytest
+from openai import APIConnectionError
+from app.services import http_transport
+from app.services.http_transport import CircuitBreaker, CircuitOpenError
+
+
+def connection_error():
+    return APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    monkeypatch.setattr(http_transport, "breaker", breaker)
+    monkeypatch.setattr(http_transport.Config, "OPENAI_MAX_ATTEMPTS", 1)
+    return breaker
+
+def fail(error):
+    def call():
+        raise error
+    return call
+
+def test_opens_after_threshold_then_half_opens(breaker):
+    for _ in range(2):
+        with pytest.raises(APIConnectionError):
+            http_transport.call_with_retry(fail(connection_error()))
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        http_transport.call_with_retry(lambda: "never called")
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert http_transport.call_with_retry(lambda: "ok") == "ok"
+    assert breaker.state == "closed"
+
+def test_failed_trial_reopens(breaker):
+    breaker.failure_threshold = 1
+    with pytest.raises(APIConnectionError):
+        http_transport.call_with_retry(fail(connection_error()))
+    time.sleep(0.06)
+    with pytest.raises(APIConnectionError):
+        http_transport.call_with_retry(fail(connection_error()))
+    assert breaker.state == "open"
+
+def test_one_trial_at_a_time(breaker):
+    breaker.failure_threshold = 1
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.before_call()  # the trial
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+def test_non_retryable_errors_do_not_count(breaker):
+    breaker.failure_threshold = 1
+    with pytest.raises(ValueError):
+        http_transport.call_with_retry(fail(ValueError("400 bad request")))
+    assert breaker.state == "closed"
+
+def test_cancelled_trial_is_released_not_failed(breaker):
+    breaker.failure_threshold = 1
+    breaker.record_failure()
+
+    async def run():
+        await asyncio.sleep(0.06)
+
+        async def slow():
+            await asyncio.sleep(1)
+
+        # A discarded speculative draft / SLO fallback cancels the trial
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(http_transport.acall_with_retry(slow), 0.01)
+        assert breaker.state == "half_open"
+        assert not breaker._trial_in_flight
+
+        async def ok():
+            return "ok"
+
+        return await http_transport.acall_with_retry(ok)
+
+    assert asyncio.run(run()) == "ok"
+    assert breaker.state == "closed"
@@ -0,0 +1,86 @@
+# JamieBot/tests/test_followups.py
+import asyncio
+from app.services.followups import ATTEMPTS_KEY, PROCESSING_KEY, FollowUpJob, FollowUpScheduler
+from app.state_machine.states import ConversationState
+
+DELAYS = {"10_min": 600, "24_hour": 86400}
+
+
+def schedule(scheduler, *user_ids, now=1000.0, state=ConversationState.STAGE_1_PATTERN):
+    pipe = scheduler.client.pipeline(transaction=False)
+    for user_id in user_ids:
+        scheduler.queue_activity(pipe, user_id, state, now=now)
+    return pipe.execute()
+
+def test_claim_moves_due_users_under_a_lease(redis_service):
+    async def run():
+        scheduler = FollowUpScheduler(redis_service, delays=DELAYS, lease_seconds=60)
+        await schedule(scheduler, "a", "b", "c")
+        first = await scheduler.claim("10_min", batch_size=2, now=2000)
+        second = await scheduler.claim("10_min", batch_size=10, now=2000)
+        not_due = await scheduler.claim("24_hour", batch_size=10, now=2000)
+        leases = await redis_service.client.zrange(PROCESSING_KEY, 0, -1, withscores=True)
+        return first, second, not_due, leases
+
+    first, second, not_due, leases = asyncio.run(run())
+    # Each user is handed out once
+    assert [job.user_id for job in first] == ["a", "b"]
+    assert [job.user_id for job in second] == ["c"]
+    assert not_due == []
+    assert leases == [("10_min:a", 2060.0), ("10_min:b", 2060.0), ("10_min:c", 2060.0)]
+
+def test_finished_conversations_are_not_scheduled(redis_service):
+    async def run():
+        scheduler = FollowUpScheduler(redis_service, delays=DELAYS)
+        await schedule(scheduler, "a")
+        await schedule(scheduler, "a", state=ConversationState.END)
+        return await scheduler.stats()
+
+    assert asyncio.run(run()) == {"scheduled_10_min": 0, "scheduled_24_hour": 0, "processing": 0}
+
+def test_expired_leases_are_requeued_until_max_attempts(redis_service):
+    async def run():
+        scheduler = FollowUpScheduler(redis_service, delays=DELAYS, lease_seconds=60, max_attempts=2)
+        await schedule(scheduler, "a")
+        rounds = []
+        for now in (2000, 3000):
+            await scheduler.claim("10_min", batch_size=10, now=now)
+            requeued = await scheduler.requeue_expired(now=now + 61)
+            rounds.append((requeued, await scheduler.stats()))
+        return rounds, await redis_service.client.hgetall(ATTEMPTS_KEY)
+
+    rounds, attempts = asyncio.run(run())
+    assert rounds[0] == (1, {"scheduled_10_min": 1, "scheduled_24_hour": 1, "processing": 0})
+    # Second failure hits max_attempts: dropped, attempt counter cleaned up
+    assert rounds[1] == (0, {"scheduled_10_min": 0, "scheduled_24_hour": 1, "processing": 0})
+    assert attempts == {}
+
+def test_live_leases_and_unknown_stages_are_not_requeued(redis_service):
+    async def run():
+        scheduler = FollowUpScheduler(redis_service, delays=DELAYS, lease_seconds=60)
+        await schedule(scheduler, "a")
+        await scheduler.claim("10_min", batch_size=10, now=2000)
+        live = await scheduler.requeue_expired(now=2030)
+        # A claim from a stage that is no longer configured
+        await redis_service.client.zadd(PROCESSING_KEY, {"1_week:b": 1000})
+        expired = await scheduler.requeue_expired(now=2100)
+        return live, expired, await scheduler.stats()
+
+    live, expired, stats = asyncio.run(run())
+    assert live == 0
+    assert expired == 1
+    assert stats == {"scheduled_10_min": 1, "scheduled_24_hour": 1, "processing": 0}
+
+def test_ack_and_superseded(redis_service):
+    async def run():
+        scheduler = FollowUpScheduler(redis_service, delays=DELAYS)
+        await schedule(scheduler, "a")
+        [job] = await scheduler.claim("10_min", batch_size=1, now=2000)
+        before = await scheduler.is_superseded(job)
+        await schedule(scheduler, "a", now=2500)  # the user wrote again
+        after = await scheduler.is_superseded(job)
+        await scheduler.ack(job)
+        return before, after, await redis_service.client.zcard(PROCESSING_KEY)
+
+    assert asyncio.run(run()) == (False, True, 0)
+    assert FollowUpJob("10_min", "a").member == "10_min:a"
@@ -0,0 +1,59 @@
+# JamieBot/tests/test_history_codec.py
+import asyncio
+import json
+import pytest
+from app.services.history_codec import FORMAT_PLAIN, FORMAT_ZLIB, decode_message, encode_message
+
+MESSAGES = [
+    ("user", "hi"),
+    ("assistant", "jamie here, good to meet you! how’s your day going so far?"),
+    ("user", "Café con leche and déjà vu 😂"),
+    ("system", "[EARLIER IN THIS CONVERSATION]:\nnotes"),
+    ("user", "I keep getting ghosted after the first date. " * 20),
+    ("user", ""),
+]
+
+@pytest.mark.parametrize("codec", ["binary", "json"])
+@pytest.mark.parametrize("role, content", MESSAGES)
+def test_round_trip(codec, role, content):
+    assert decode_message(encode_message(role, content, codec=codec)) == {"role": role, "content": content}
+
+def test_long_messages_are_compressed_short_ones_are_not():
+    assert encode_message("user", "hi", codec="binary")[0] == FORMAT_PLAIN
+    assert encode_message("user", "ghosted again. " * 30, codec="binary")[0] == FORMAT_ZLIB
+    assert encode_message("user", "ghosted again. " * 30, codec="binary", compress_min=0)[0] == FORMAT_PLAIN
+
+def test_unknown_roles_fall_back_to_json():
+    raw = encode_message("tool", "result", codec="binary")
+    assert json.loads(raw) == {"role": "tool", "content": "result"}
+    assert decode_message(raw) == {"role": "tool", "content": "result"}
+
+@pytest.mark.parametrize("raw", [
+    # Entries written before the codec, as bytes and as a decoding client returns them
+    json.dumps({"role": "user", "content": "déjà vu"}).encode("utf-8"),
+    json.dumps({"role": "user", "content": "déjà vu"}),
+    json.dumps({"role": "user", "content": "déjà vu"}, ensure_ascii=False),
+])
+def test_legacy_json_entries(raw):
+    assert decode_message(raw) == {"role": "user", "content": "déjà vu"}
+
+def test_empty_entry_is_rejected():
+    with pytest.raises(ValueError):
+        decode_message(b"")
+
+def test_mixed_history_through_redis(redis_service):
+    async def run():
+        # Legacy JSON, then binary entries (plain + zlib) on the same list
+        await redis_service.client.rpush(
+            redis_service.history_key("u"),
+            json.dumps({"role": "user", "content": "old entry"}),
+            encode_message("user", "new entry " * 40, codec="binary"),
+            encode_message("assistant", "reply", codec="binary"),
+        )
+        return await redis_service.get_history("u")
+
+    assert asyncio.run(run()) == [
+        {"role": "user", "content": "old entry"},
+        {"role": "user", "content": "new entry " * 40},
+        {"role": "assistant", "content": "reply"},
+    ]
@@ -0,0 +1,71 @@
+# JamieBot/tests/test_keyword_matcher.py
+import pytest
+from app.routing.keyword_matcher import ABUSIVE, DATING, UNSAFE, KEYWORD_MATCHER, KeywordAutomaton
+from app.routing.problem_inference import ProblemTag, infer_problem_tag
+from app.state_machine.exit_rules import is_abusive, normalize_text
+from app.validators.safety_check import validate_safety
+
+
+def scan(text):
+    return KEYWORD_MATCHER.scan(normalize_text(text))
+
+@pytest.mark.parametrize("text", [
+    "pornography", "porno", "i watch pornhub", "sexual stuff", "send nudes", "sexting", "any hookups?",
+])
+def test_unsafe_forms(text):
+    assert not validate_safety(text)
+
+@pytest.mark.parametrize("text", [
+    "I use a sextant", "my ex called me sexist", "fire retardant", "help me text her", "I'm in Sussex",
+])
+def test_unsafe_false_positives(text):
+    assert validate_safety(text)
+
+@pytest.mark.parametrize("text", [
+    "motherfucker", "fuckin hell", "fucked up bot", "you bitches", "go die", "I will kill you", "kys",
+])
+def test_abusive_forms(text):
+    assert is_abusive(text)
+
+@pytest.mark.parametrize("text", [
+    "I'm on a diet", "great skill", "that's a killer profile", "studied the grape harvest",
+])
+def test_abusive_whole_words(text):
+    assert not is_abusive(text)
+
+@pytest.mark.parametrize("text, tag", [
+    ("she texted me", ProblemTag.TEXTING),
+    ("kissing is hard", ProblemTag.ESCALATION),
+    ("I approached her", ProblemTag.APPROACH),
+    ("no matches on tinder", ProblemTag.MATCHES),
+    ("I feel lost", ProblemTag.CONFIDENCE),
+    ("nothing specific", ProblemTag.GENERAL),
+])
+def test_problem_inflections(text, tag):
+    assert infer_problem_tag(normalize_text(text)) == tag
+
+@pytest.mark.parametrize("text", ["my relationships never last", "my girlfriends", "I got ghosted"])
+def test_dating_inflections(text):
+    assert DATING in scan(text)
+
+def test_inflection_needs_a_known_suffix():
+    matcher = KeywordAutomaton({"t": {"text"}}, inflected=["t"])
+    assert matcher.scan("texted") == {"t"}
+    assert matcher.scan("textbook") == frozenset()
+    assert matcher.scan("context") == frozenset()
+
+def test_stems_and_exceptions():
+    matcher = KeywordAutomaton({"s": {"sex*", "*fuck*", "die"}}, exceptions={"sextant"})
+    assert matcher.scan("sexy") == {"s"}
+    assert matcher.scan("motherfucking") == {"s"}
+    assert matcher.scan("sextant") == frozenset()
+    assert matcher.scan("sussex") == frozenset()
+    assert matcher.scan("diet") == frozenset()
+
+def test_find_all_spans():
+    matcher = KeywordAutomaton({"a": {"porn*"}, "b": {"in person"}}, inflected=["b"])
+    assert list(matcher.find_all("pornhub in person")) == [(0, 7, "a"), (8, 17, "b")]
+
+def test_categories_are_reported_once():
+    assert scan("fuck off you bitch, go die") == {ABUSIVE}
+    assert UNSAFE in scan("nudes nudes nudes")
@@ -0,0 +1,42 @@
+# JamieBot/tests/test_reply_check.py
+import pytest
+from app.validators.length_check import split_sentences, validate_length
+from app.validators.reply_check import check_reply, repair_reply
+
+
+@pytest.mark.parametrize("text, count", [
+    ("hmm... i get that. what happened after?", 2),
+    ("check jamiedatecoaching.com for more. does that help?", 2),
+    ("wait…really?", 1),
+    ("no way!! seriously?! tell me more.", 3),
+    ("", 0),
+])
+def test_split_sentences(text, count):
+    assert len(split_sentences(text)) == count
+
+@pytest.mark.parametrize("text", [
+    "hmm... i get that. what happened after?",
+    "check jamiedatecoaching.com for more. does that help?",
+    "ok so... are you in the US or europe?",
+])
+def test_persona_style_is_valid(text):
+    assert validate_length(text)
+    assert check_reply(text) == []
+
+@pytest.mark.parametrize("text, repaired", [
+    # The first full question wins over a trailing fragment
+    ("ok so... are you in the US? or europe?", "ok so... are you in the US?"),
+    ("That sounds rough. I get it. What happened? Was it bad?", "That sounds rough. What happened?"),
+    ("Nice! Love that... really. So what now?", "Nice! So what now?"),
+    ("One. Two. Three.", "One. Two."),
+])
+def test_repair_reply(text, repaired):
+    assert repair_reply(text) == repaired
+    assert check_reply(repaired) == []
+
+def test_repair_gives_up_when_most_of_the_reply_would_go():
+    text = "ok. " + "this is a very long explanation that keeps going and going. " * 3 + "right?"
+    assert repair_reply(text) is None
+
+def test_repair_of_nothing():
+    assert repair_reply("...") is None
@@ -0,0 +1,75 @@
+# JamieBot/tests/test_turn_lock.py
+import asyncio
+import pytest
+from app.services.session_store import Session, SessionConflictError, SessionStore
+from app.services.turn_lock import TurnLock, TurnLockTimeout
+
+
+def test_fences_increase_per_user(redis_service):
+    async def run():
+        lock = TurnLock(redis_service)
+        fences = []
+        for user_id in ("a", "a", "b", "a"):
+            async with lock.hold(user_id) as fence:
+                fences.append(fence)
+        return fences
+
+    assert asyncio.run(run()) == [1, 2, 1, 3]
+
+def test_second_holder_waits_for_release(redis_service):
+    async def run():
+        lock = TurnLock(redis_service)
+        order = []
+
+        async def turn(name):
+            async with lock.hold("u") as fence:
+                order.append((name, "start", fence))
+                await asyncio.sleep(0.05)
+                order.append((name, "end", fence))
+
+        await asyncio.gather(turn("first"), turn("second"))
+        return order
+
+    order = asyncio.run(run())
+    assert [step for _, step, _ in order] == ["start", "end", "start", "end"]
+    assert order[0][2] < order[2][2]
+
+def test_other_worker_times_out_while_lease_is_held(redis_service):
+    async def run():
+        # Two TurnLocks = two worker processes: only the Redis lease is shared
+        holder = TurnLock(redis_service)
+        other = TurnLock(redis_service, wait_timeout=0.1)
+        async with holder.hold("u"):
+            with pytest.raises(TurnLockTimeout):
+                async with other.hold("u"):
+                    pass
+        async with other.hold("u") as fence:
+            return fence
+
+    assert asyncio.run(run()) == 2
+
+def test_commit_rejects_stale_fence(redis_service):
+    async def run():
+        store = SessionStore(redis_service)
+        lock = TurnLock(redis_service)
+        async with lock.hold("u") as old_fence:
+            pass
+        async with lock.hold("u") as new_fence:
+            await store.commit("u", Session(), "hi", "hey", fence=new_fence)
+
+        # A turn whose lease expired (old fence) must not overwrite the newer commit
+        session, _ = await store.load("u")
+        with pytest.raises(SessionConflictError):
+            await store.commit("u", session, "late", "reply", fence=old_fence)
+
+    asyncio.run(run())
+
+def test_release_frees_local_state(redis_service):
+    async def run():
+        lock = TurnLock(redis_service)
+        async with lock.hold("u"):
+            assert "u" in lock._local
+        return lock._local, await redis_service.client.exists("jamie_lock:u")
+
+    local, held = asyncio.run(run())
+    assert local == {} and held == 0